@@ -1,7 +1,21 @@
 """Quick check of MongoDB data — detailed."""
 import asyncio
+from functools import lru_cache
+from pathlib import Path
+
+import orjson
+
 from database import mongodb
 
+CONFIG_PATH = Path(__file__).parent / "constituents.json"
+
+
+@lru_cache(maxsize=1)
+def _load_configured() -> frozenset:
+    """Tickers configured in constituents.json (parsed once per process)."""
+    config = orjson.loads(CONFIG_PATH.read_bytes())
+    return frozenset(config.get("constituents", {}).keys())
+
 
 async def check():
     await mongodb.connect()
@@ -9,7 +23,7 @@ async def check():
     print(f"Tickers in DB: {len(summary)}")
     print()
     total = 0
-    for ticker, info in sorted(summary.items()):
+    for ticker, info in summary.items():  # already sorted by the aggregation
         total += info["count"]
         short = ticker.replace(".JK", "")
         print(f"  {short:8s} | {info['count']:5d} records | {info['first_date']} -> {info['last_date']}")
@@ -17,15 +31,8 @@ async def check():
     print(f"Total records: {total:,}")
 
     # Check which tickers from config are missing
-    import json
-    from pathlib import Path
-    config_path = Path(__file__).parent / "constituents.json"
-    with open(config_path, "r", encoding="utf-8") as f:
-        config = json.load(f)
-
-    configured = set(config.get("constituents", {}).keys())
-    in_db = set(summary.keys())
-    missing = configured - in_db
+    configured = _load_configured()
+    missing = configured - summary.keys()
     if missing:
         print(f"\nMISSING from DB: {missing}")
     else:
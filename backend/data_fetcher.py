@@ -2,21 +2,48 @@
 Data fetcher module — retrieves stock data from Yahoo Finance via yfinance.
 Supports MongoDB Atlas caching: only fetches data not already stored.
 """
+import asyncio
 import yfinance as yf
 import pandas as pd
 import numpy as np
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Optional
-from datetime import datetime, timedelta
+from datetime import date, timedelta
 
 logger = logging.getLogger("mhgi.data_fetcher")
 
+# (DataFrame column, lowercase price-doc key)
+OHLCV_FIELDS = (
+    ("Open", "open"),
+    ("High", "high"),
+    ("Low", "low"),
+    ("Close", "close"),
+    ("Volume", "volume"),
+)
+
+# Yahoo's spark endpoint accepts at most 20 symbols per request
+YF_CHUNK_SIZE = 20
+# yf.download worker threads: per batch, and across concurrent batches
+YF_MAX_THREADS = 16
+YF_TOTAL_THREADS = 32
+# Max concurrent yf.Ticker(...).info requests
+INFO_MAX_WORKERS = 16
+# In-process memo in front of the MongoDB stock-info cache
+INFO_CACHE_TTL = 24 * 3600  # seconds
+CACHE_MAX_ENTRIES = 2048
+# Max concurrent yf.download batches in fetch_historical_incremental
+HISTORY_FETCH_CONCURRENCY = 8
+
 
 class DataFetcher:
     """Fetches stock data from Yahoo Finance, with MongoDB-backed caching."""
 
     def __init__(self):
         self._db = None  # Set via set_db()
+        self._cache: dict = {}
+        self._cache_expiry: dict = {}  # key → time.monotonic() deadline
 
     def set_db(self, db_manager):
         """Inject MongoDB manager for persistent caching."""
@@ -26,6 +53,68 @@ class DataFetcher:
     def has_db(self) -> bool:
         return self._db is not None and self._db.is_connected
 
+    # ─────────── IN-PROCESS CACHE ───────────
+
+    def _is_cache_valid(self, key: str) -> bool:
+        expiry = self._cache_expiry.get(key)
+        return expiry is not None and time.monotonic() < expiry
+
+    def _cache_set(self, key: str, value, ttl: float):
+        """Store a value with a TTL, evicting the oldest entries beyond CACHE_MAX_ENTRIES."""
+        self._cache.pop(key, None)
+        self._cache[key] = value
+        self._cache_expiry[key] = time.monotonic() + ttl
+        while len(self._cache) > CACHE_MAX_ENTRIES:
+            oldest = next(iter(self._cache))
+            del self._cache[oldest]
+            self._cache_expiry.pop(oldest, None)
+
+    @staticmethod
+    def _chunked(tickers: list[str], n: int = YF_CHUNK_SIZE):
+        """Yield successive groups of at most n tickers."""
+        for i in range(0, len(tickers), n):
+            yield tickers[i : i + n]
+
+    @staticmethod
+    def _download_threads(n_tickers: int) -> int:
+        """Worker threads for one yf.download batch — scaled to its size."""
+        return max(1, min(n_tickers // 2, YF_MAX_THREADS))
+
+    def _download_chunked(self, tickers: list[str], **kwargs) -> dict:
+        """
+        Download data for many tickers in batches of YF_CHUNK_SIZE symbols.
+        Returns dict of {ticker: DataFrame} with flat OHLCV columns.
+        """
+        frames = {}
+        for chunk in self._chunked(tickers):
+            try:
+                data = yf.download(
+                    " ".join(chunk),
+                    group_by="ticker",
+                    progress=False,
+                    threads=self._download_threads(len(chunk)),
+                    **kwargs,
+                )
+            except Exception as e:
+                logger.error(f"Error in batch download ({', '.join(chunk)}): {e}")
+                continue
+
+            # group_by="ticker" yields (ticker, field) columns; slice each
+            # ticker out with xs() so the columns come back already flat
+            if not isinstance(data.columns, pd.MultiIndex):
+                if len(chunk) == 1:
+                    frames[chunk[0]] = data
+                continue
+
+            for ticker in chunk:
+                try:
+                    frames[ticker] = data.xs(ticker, axis=1, level=0, drop_level=True)
+                except Exception as e:
+                    logger.warning(f"Error extracting batch data for {ticker}: {e}")
+                    continue
+
+        return frames
+
     # ─────────── CURRENT PRICES ───────────
 
     def fetch_current_prices(self, tickers: list[str]) -> dict:
@@ -34,65 +123,38 @@ class DataFetcher:
         Returns dict of {ticker: {price, change, change_percent, volume, ...}}
         """
         result = {}
-        try:
-            ticker_str = " ".join(tickers)
-            data = yf.download(
-                ticker_str,
-                period="2d",
-                interval="1d",
-                group_by="ticker",
-                progress=False,
-                threads=True,
-            )
-
-            for ticker in tickers:
-                try:
-                    if len(tickers) == 1:
-                        ticker_data = data
-                    else:
-                        ticker_data = data[ticker]
-
-                    if ticker_data.empty:
-                        continue
-
-                    if isinstance(ticker_data.columns, pd.MultiIndex):
-                        ticker_data.columns = ticker_data.columns.get_level_values(-1)
-
-                    ticker_data = ticker_data.dropna(subset=["Close"])
-
-                    if len(ticker_data) >= 2:
-                        current = ticker_data.iloc[-1]
-                        previous = ticker_data.iloc[-2]
-                        price = float(current["Close"])
-                        prev_close = float(previous["Close"])
-                        change = price - prev_close
-                        change_pct = (change / prev_close) * 100 if prev_close else 0
-                    elif len(ticker_data) == 1:
-                        current = ticker_data.iloc[-1]
-                        price = float(current["Close"])
-                        prev_close = float(current.get("Open", price))
-                        change = price - prev_close
-                        change_pct = (change / prev_close) * 100 if prev_close else 0
-                    else:
-                        continue
-
-                    result[ticker] = {
-                        "price": price,
-                        "open": float(current.get("Open", price)),
-                        "high": float(current.get("High", price)),
-                        "low": float(current.get("Low", price)),
-                        "close": price,
-                        "previous_close": prev_close,
-                        "change": round(change, 2),
-                        "change_percent": round(change_pct, 4),
-                        "volume": int(current.get("Volume", 0)),
-                    }
-                except Exception as e:
-                    logger.warning(f"Error fetching data for {ticker}: {e}")
+        frames = self._download_chunked(tickers, period="2d", interval="1d")
+
+        for ticker, ticker_data in frames.items():
+            try:
+                if ticker_data.empty:
                     continue
 
-        except Exception as e:
-            logger.error(f"Error in batch download: {e}")
+                ticker_data = ticker_data.dropna(subset=["Close"])
+                if ticker_data.empty:
+                    continue
+
+                # Read the last two rows as raw floats instead of building Series
+                vals = ticker_data[["Open", "High", "Low", "Close", "Volume"]].to_numpy(dtype=np.float64)
+                open_, high, low, price, volume = vals[-1].tolist()
+                prev_close = float(vals[-2, 3]) if len(vals) >= 2 else open_
+                change = price - prev_close
+                change_pct = (change / prev_close) * 100 if prev_close else 0
+
+                result[ticker] = {
+                    "price": price,
+                    "open": open_,
+                    "high": high,
+                    "low": low,
+                    "close": price,
+                    "previous_close": prev_close,
+                    "change": round(change, 2),
+                    "change_percent": round(change_pct, 4),
+                    "volume": int(volume),
+                }
+            except Exception as e:
+                logger.warning(f"Error fetching data for {ticker}: {e}")
+                continue
 
         return result
 
@@ -103,17 +165,24 @@ class DataFetcher:
         Fetch stock info with MongoDB caching.
         3-tier fallback: fresh cache → yfinance → stale cache.
         This ensures data is always available even when yfinance rate-limits.
+        Fresh results are also memoized in-process for INFO_CACHE_TTL.
         """
+        cache_key = f"info_{ticker}"
+        if self._is_cache_valid(cache_key):
+            return self._cache[cache_key]
+
         # Tier 1: Try fresh MongoDB cache (<24h)
         if self.has_db:
             cached = await self._db.load_stock_info(ticker, allow_stale=False)
             if cached:
                 logger.info(f"  {ticker}: Stock info loaded from MongoDB (fresh cache)")
+                self._cache_set(cache_key, cached, INFO_CACHE_TTL)
                 return cached
 
-        # Tier 2: Try yfinance
-        result = self._fetch_stock_info_yf(ticker)
+        # Tier 2: Try yfinance (off the event loop — .info blocks on HTTP)
+        result = await asyncio.to_thread(self._fetch_stock_info_yf, ticker)
         if result is not None:
+            self._cache_set(cache_key, result, INFO_CACHE_TTL)
             # Save to MongoDB
             if self.has_db:
                 await self._db.save_stock_info(ticker, result)
@@ -151,172 +220,305 @@ class DataFetcher:
         return self._fetch_stock_info_yf(ticker)
 
     async def fetch_stocks_info_async(self, tickers: list[str]) -> dict:
-        """Fetch info for multiple stocks with MongoDB caching."""
-        result = {}
+        """
+        Fetch info for multiple stocks with MongoDB caching.
+        Same 3-tier fallback as fetch_stock_info_async, but each tier is
+        resolved for all tickers at once instead of one ticker at a time.
+        """
+        result = {
+            t: self._cache[f"info_{t}"] for t in tickers if self._is_cache_valid(f"info_{t}")
+        }
+
+        # Tier 1: Fresh MongoDB cache (<24h) — one query for all uncached tickers
+        uncached = [t for t in tickers if t not in result]
+        if self.has_db and uncached:
+            cached = await self._db.load_stock_info_many(uncached, allow_stale=False)
+            if cached:
+                logger.info(f"  Stock info for {len(cached)} tickers loaded from MongoDB (fresh cache)")
+            for ticker, info in cached.items():
+                self._cache_set(f"info_{ticker}", info, INFO_CACHE_TTL)
+            result.update(cached)
+
+        # Tier 2: yfinance for the cache misses, concurrently
+        misses = [t for t in tickers if t not in result]
+        infos = await asyncio.gather(
+            *[asyncio.to_thread(self._fetch_stock_info_yf, t) for t in misses]
+        )
+        fetched = {t: info for t, info in zip(misses, infos) if info is not None}
+        if fetched and self.has_db:
+            await asyncio.gather(*[self._db.save_stock_info(t, info) for t, info in fetched.items()])
+        for ticker, info in fetched.items():
+            self._cache_set(f"info_{ticker}", info, INFO_CACHE_TTL)
+        result.update(fetched)
+
+        # Tier 3: Stale MongoDB cache (any age) for whatever is still missing
+        failed = [t for t in misses if t not in result]
+        if failed and self.has_db:
+            stale = await self._db.load_stock_info_many(failed, allow_stale=True)
+            for ticker in stale:
+                logger.warning(f"  {ticker}: Using stale MongoDB cache (yfinance failed)")
+            result.update(stale)
+
         for ticker in tickers:
-            info = await self.fetch_stock_info_async(ticker)
-            if info:
-                result[ticker] = info
-        return result
+            if ticker not in result:
+                logger.error(f"  {ticker}: No stock info available (all sources failed)")
+
+        return {t: result[t] for t in tickers if t in result}
 
     def fetch_stocks_info(self, tickers: list[str]) -> dict:
-        """Sync version — fetch info for multiple stocks."""
-        result = {}
-        for ticker in tickers:
-            info = self.fetch_stock_info(ticker)
-            if info:
-                result[ticker] = info
-        return result
+        """Sync version — fetch info for multiple stocks in a thread pool."""
+        if not tickers:
+            return {}
+
+        fetched = {}
+        with ThreadPoolExecutor(max_workers=min(len(tickers), INFO_MAX_WORKERS)) as ex:
+            futures = {ex.submit(self.fetch_stock_info, t): t for t in tickers}
+            for future in as_completed(futures):
+                info = future.result()
+                if info:
+                    fetched[futures[future]] = info
+
+        # Keep the caller's ticker order
+        return {t: fetched[t] for t in tickers if t in fetched}
 
     # ─────────── HISTORICAL PRICES (with incremental MongoDB fetch) ───────────
 
     async def fetch_historical_incremental(
-        self, tickers: list[str], base_date: str = "2025-01-02"
+        self, tickers: list[str], base_date: str = "2025-01-02", return_data: bool = True
     ) -> dict:
         """
         Fetch historical data incrementally:
         1. Load existing data from MongoDB
         2. Determine last stored date per ticker
-        3. Only fetch new dates from yfinance
+        3. Only fetch new dates from yfinance (one batched download per start date)
         4. Save new data to MongoDB
         5. Return complete dataset as DataFrames
+
+        MongoDB reads/writes for all tickers run concurrently, and the blocking
+        yf.download batches run in worker threads (bounded by
+        HISTORY_FETCH_CONCURRENCY) so the event loop is never blocked.
+
+        With return_data=False nothing is loaded or fetched; the result is a
+        freshness report {ticker: {"up_to_date": bool, "last_date": str|None}}.
         """
+        today = date.today().isoformat()
+        has_db = self.has_db  # checked once, not per ticker
+
+        # Steps 1–2: Load from MongoDB and group tickers by fetch start date
+        last_dates = await self._db.get_last_price_dates(tickers) if has_db else {}
+        loaded = await asyncio.gather(
+            *[
+                self._load_stored_prices(t, base_date, last_dates.get(t), return_data)
+                for t in tickers
+            ],
+            return_exceptions=True,
+        )
+
+        existing = {}
+        status = {}
+        pending: dict[Optional[str], list[str]] = {}  # start date (None = full) → tickers
+        for ticker, outcome in zip(tickers, loaded):
+            if isinstance(outcome, Exception):
+                logger.error(f"Error in incremental fetch for {ticker}: {outcome}")
+                continue
+
+            existing_df = outcome
+            last_date = last_dates.get(ticker)
+            # Fetch from day after last stored date
+            start = (date.fromisoformat(last_date) + timedelta(days=1)).isoformat() if last_date else None
+
+            if not return_data:
+                status[ticker] = {
+                    "up_to_date": start is not None and start > today,
+                    "last_date": last_date,
+                }
+                continue
+
+            existing[ticker] = existing_df
+            if start is None:
+                # No data in MongoDB — fetch everything
+                logger.info(f"  {ticker}: No MongoDB data, fetching full history")
+                pending.setdefault(None, []).append(ticker)
+            elif start <= today:
+                logger.info(f"  {ticker}: Fetching new data from {start} to {today}")
+                pending.setdefault(start, []).append(ticker)
+            else:
+                logger.info(f"  {ticker}: Already up to date")
+
+        if not return_data:
+            return status
+
+        # Step 3: Tickers sharing the same start date go through one batched download
+        # Keep total yfinance workers across concurrent batches ≤ YF_TOTAL_THREADS
+        per_batch = self._download_threads(min(len(tickers), YF_CHUNK_SIZE))
+        semaphore = asyncio.Semaphore(
+            max(1, min(HISTORY_FETCH_CONCURRENCY, YF_TOTAL_THREADS // per_batch))
+        )
+
+        async def download(start: Optional[str], group: list[str]) -> dict:
+            async with semaphore:
+                if start is None:
+                    return await asyncio.to_thread(self._fetch_historical_full, group)
+                return await asyncio.to_thread(self._fetch_historical_range, group, start, today)
+
+        fetched = {}
+        for frames in await asyncio.gather(*[download(s, g) for s, g in pending.items()]):
+            fetched.update(frames)
+
+        # Step 4: Save all new prices in one cross-ticker bulk write
+        if has_db:
+            new_prices = {
+                t: self._df_to_price_docs(df)
+                for t, df in fetched.items()
+                if t in existing and not df.empty
+            }
+            if new_prices:
+                await self._db.save_stock_prices_multi(new_prices, last_dates)
+
+        # Step 5: Build the complete DataFrames. This is CPU work, so it runs
+        # in worker threads rather than on the event loop.
+        merged = await asyncio.gather(
+            *[
+                asyncio.to_thread(self._merge_history, existing_df, fetched.get(t, pd.DataFrame()))
+                for t, existing_df in existing.items()
+            ],
+            return_exceptions=True,
+        )
+
         result = {}
+        for ticker, outcome in zip(existing, merged):
+            if isinstance(outcome, Exception):
+                logger.error(f"Error in incremental fetch for {ticker}: {outcome}")
+            elif outcome is None:
+                logger.warning(f"  {ticker}: No data available")
+            else:
+                result[ticker] = self._column_major(outcome)
+        return result
 
-        for ticker in tickers:
-            try:
-                existing_data = []
-                last_date = None
-
-                # Step 1: Load from MongoDB
-                if self.has_db:
-                    last_date = await self._db.get_last_price_date(ticker)
-                    if last_date:
-                        existing_data = await self._db.get_stock_prices(ticker, start_date=base_date)
-                        logger.info(
-                            f"  {ticker}: {len(existing_data)} prices from MongoDB (last: {last_date})"
-                        )
-
-                # Step 2: Determine what to fetch from yfinance
-                if last_date:
-                    # Fetch from day after last stored date
-                    start = (datetime.strptime(last_date, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
-                    today = datetime.now().strftime("%Y-%m-%d")
-
-                    if start <= today:
-                        logger.info(f"  {ticker}: Fetching new data from {start} to {today}")
-                        new_data = self._fetch_historical_range(ticker, start, today)
-                    else:
-                        new_data = pd.DataFrame()
-                        logger.info(f"  {ticker}: Already up to date")
-                else:
-                    # No data in MongoDB — fetch everything
-                    logger.info(f"  {ticker}: No MongoDB data, fetching full history")
-                    new_data = self._fetch_historical_full(ticker)
-
-                # Step 3: Save new data to MongoDB
-                if not new_data.empty and self.has_db:
-                    prices_to_save = self._df_to_price_docs(new_data)
-                    await self._db.save_stock_prices(ticker, prices_to_save)
-                    logger.info(f"  {ticker}: Saved {len(prices_to_save)} new prices to MongoDB")
-
-                # Step 4: Build complete DataFrame
-                if existing_data and not new_data.empty:
-                    # Merge MongoDB data + new yfinance data
-                    existing_df = self._price_docs_to_df(existing_data)
-                    combined = pd.concat([existing_df, new_data])
-                    combined = combined[~combined.index.duplicated(keep="last")]
-                    combined = combined.sort_index()
-                    result[ticker] = combined
-                elif existing_data:
-                    result[ticker] = self._price_docs_to_df(existing_data)
-                elif not new_data.empty:
-                    result[ticker] = new_data
-                else:
-                    logger.warning(f"  {ticker}: No data available")
+    @staticmethod
+    def _column_major(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Lay a frame out column-major: one contiguous array per column.
+        The index engine reduces each ticker's history column-at-a-time
+        (mostly "Close" over all dates), so after concat/combine_first we
+        copy each column into its own contiguous buffer rather than leaving
+        a strided view into a mixed 2-D block.
+        """
+        return pd.DataFrame(
+            {col: np.ascontiguousarray(df[col].to_numpy()) for col in df.columns},
+            index=df.index,
+        )
+
+    async def _load_stored_prices(
+        self, ticker: str, base_date: str, last_date: Optional[str], with_history: bool = True
+    ) -> Optional[pd.DataFrame]:
+        """
+        Load stored prices for a ticker from MongoDB.
+        Returns None when nothing is stored (no last_date) or with_history=False.
+        Not memoized: the collection can be rewritten by other processes
+        (seed_database.py, reset_and_refetch.py) while the API runs.
+        """
+        if not last_date or not with_history:
+            return None
+
+        existing_data = await self._db.get_stock_prices(ticker, start_date=base_date)
+        logger.info(
+            f"  {ticker}: {len(existing_data)} prices from MongoDB (last: {last_date})"
+        )
+        if not existing_data:
+            return None
 
+        return await asyncio.to_thread(self._price_docs_to_df, existing_data)
+
+    @staticmethod
+    def _merge_history(
+        existing_df: Optional[pd.DataFrame], new_data: pd.DataFrame
+    ) -> Optional[pd.DataFrame]:
+        """Combine the stored history with newly fetched prices into one DataFrame."""
+        if existing_df is not None and not new_data.empty:
+            # Merge MongoDB data + new yfinance data. Stored prices come back
+            # sorted and new data starts after the last stored date, so a plain
+            # append is enough; fall back to combine_first if they overlap.
+            if existing_df.empty or new_data.index[0] > existing_df.index[-1]:
+                return pd.concat([existing_df, new_data])
+            return new_data.combine_first(existing_df)
+        if existing_df is not None:
+            return existing_df
+        if not new_data.empty:
+            return new_data
+        return None
+
+    def _normalize_history(self, frames: dict) -> dict:
+        """Drop rows without a close and coerce the index to datetimes."""
+        result = {}
+        for ticker, data in frames.items():
+            try:
+                data = data.dropna(subset=["Close"])
+                if not isinstance(data.index, pd.DatetimeIndex):
+                    data.index = pd.to_datetime(data.index, cache=True)
+                result[ticker] = data
             except Exception as e:
-                logger.error(f"Error in incremental fetch for {ticker}: {e}")
+                logger.warning(f"Error processing historical {ticker}: {e}")
                 continue
-
         return result
 
-    def _fetch_historical_range(self, ticker: str, start: str, end: str) -> pd.DataFrame:
+    def _fetch_historical_range(self, tickers: list[str], start: str, end: str) -> dict:
         """Fetch historical data for a date range from yfinance."""
-        try:
-            data = yf.download(
-                ticker, start=start, end=end,
-                interval="1d", progress=False, threads=True,
-            )
-            if isinstance(data.columns, pd.MultiIndex):
-                data.columns = data.columns.get_level_values(0)
-            data = data.dropna(subset=["Close"])
-            data.index = pd.to_datetime(data.index)
-            return data
-        except Exception as e:
-            logger.error(f"Error fetching range for {ticker}: {e}")
-            return pd.DataFrame()
+        frames = self._download_chunked(tickers, start=start, end=end, interval="1d")
+        return self._normalize_history(frames)
 
-    def _fetch_historical_full(self, ticker: str) -> pd.DataFrame:
+    def _fetch_historical_full(self, tickers: list[str]) -> dict:
         """Fetch full historical data from yfinance."""
-        try:
-            data = yf.download(
-                ticker, period="max", interval="1d",
-                progress=False, threads=True,
-            )
-            if isinstance(data.columns, pd.MultiIndex):
-                data.columns = data.columns.get_level_values(0)
-            data = data.dropna(subset=["Close"])
-            data.index = pd.to_datetime(data.index)
-            return data
-        except Exception as e:
-            logger.error(f"Error fetching full history for {ticker}: {e}")
-            return pd.DataFrame()
+        frames = self._download_chunked(tickers, period="max", interval="1d")
+        return self._normalize_history(frames)
 
     def _df_to_price_docs(self, df: pd.DataFrame) -> list[dict]:
-        """Convert a DataFrame to list of price documents for MongoDB."""
-        docs = []
-        for idx, row in df.iterrows():
-            docs.append({
-                "date": idx.strftime("%Y-%m-%d"),
-                "open": float(row.get("Open", 0)),
-                "high": float(row.get("High", 0)),
-                "low": float(row.get("Low", 0)),
-                "close": float(row.get("Close", 0)),
-                "volume": int(row.get("Volume", 0)),
-            })
-        return docs
+        """Convert a DataFrame to list of price documents for MongoDB.
+        Works column-at-a-time (one NumPy array per field) instead of iterrows().
+        """
+        n = len(df)
+
+        def column(name: str, dtype) -> list:
+            if name not in df.columns:
+                return [dtype(0)] * n
+            return df[name].fillna(0).to_numpy(dtype=dtype).tolist()
+
+        dates = df.index.strftime("%Y-%m-%d").tolist()
+        opens = column("Open", np.float64)
+        highs = column("High", np.float64)
+        lows = column("Low", np.float64)
+        closes = column("Close", np.float64)
+        volumes = column("Volume", np.int64)
+
+        return [
+            {"date": d, "open": o, "high": h, "low": l, "close": c, "volume": v}
+            for d, o, h, l, c, v in zip(dates, opens, highs, lows, closes, volumes)
+        ]
 
     def _price_docs_to_df(self, docs: list[dict]) -> pd.DataFrame:
         """Convert MongoDB price docs back to a DataFrame.
         Handles both timeseries format (capitalized) and lowercase format.
+        Docs are transposed into one list per column and the frame is built
+        in a single constructor call (no per-row objects, rename or drop).
         """
-        df = pd.DataFrame(docs)
+        if not docs:
+            return pd.DataFrame()
 
         # The timeseries collection uses 'Date' (datetime) as the timeField
         # and capitalized column names (Open, High, Low, Close, Volume)
-        if "Date" in df.columns:
-            df["Date"] = pd.to_datetime(df["Date"])
-            df = df.set_index("Date")
-        elif "date" in df.columns:
-            df["date"] = pd.to_datetime(df["date"])
-            df = df.set_index("date")
-
-        # Rename lowercase to uppercase if needed
-        rename_map = {}
-        for col_lower, col_upper in [("open", "Open"), ("high", "High"), ("low", "Low"), ("close", "Close"), ("volume", "Volume")]:
-            if col_lower in df.columns and col_upper not in df.columns:
-                rename_map[col_lower] = col_upper
-        if rename_map:
-            df = df.rename(columns=rename_map)
-
-        # Remove non-OHLCV columns
-        keep_cols = {"Open", "High", "Low", "Close", "Volume"}
-        drop_cols = [c for c in df.columns if c not in keep_cols]
-        if drop_cols:
-            df = df.drop(columns=drop_cols)
-
-        return df
+        first = docs[0]
+        date_key = "Date" if "Date" in first else "date"
+
+        # Resolve each OHLCV column's key once from the first doc
+        keys = {
+            upper: upper if upper in first else lower
+            for upper, lower in OHLCV_FIELDS
+            if upper in first or lower in first
+        }
+        columns = {col: [d.get(key) for d in docs] for col, key in keys.items()}
+
+        index = pd.DatetimeIndex([d[date_key] for d in docs], name=date_key)
+        return pd.DataFrame(columns, index=index)
 
     def fetch_historical(
         self, tickers: list[str], period: str = "1y", interval: str = "1d"
@@ -325,33 +527,8 @@ class DataFetcher:
         Sync fallback — fetch historical data without MongoDB.
         Used when MongoDB is not available.
         """
-        result = {}
-        try:
-            ticker_str = " ".join(tickers)
-            data = yf.download(
-                ticker_str, period=period, interval=interval,
-                group_by="ticker", progress=False, threads=True,
-            )
-
-            for ticker in tickers:
-                try:
-                    if len(tickers) == 1:
-                        ticker_data = data
-                    else:
-                        ticker_data = data[ticker]
-
-                    if isinstance(ticker_data.columns, pd.MultiIndex):
-                        ticker_data.columns = ticker_data.columns.get_level_values(-1)
-
-                    ticker_data = ticker_data.dropna(subset=["Close"])
-                    result[ticker] = ticker_data
-                except Exception as e:
-                    logger.warning(f"Error processing historical {ticker}: {e}")
-                    continue
-        except Exception as e:
-            logger.error(f"Error fetching historical data: {e}")
-
-        return result
+        frames = self._download_chunked(tickers, period=period, interval=interval)
+        return self._normalize_history(frames)
 
 
 # Singleton instance
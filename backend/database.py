@@ -4,13 +4,16 @@ MongoDB Atlas connection manager for MHGI.
 Handles a single timeseries collection (Standard_Index) with timeField=Date.
 Also maintains regular collections for stock_info and engine_state.
 """
+import asyncio
 import logging
 import os
-from datetime import datetime
-from typing import Optional
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import AsyncIterator, Optional
 
 from dotenv import load_dotenv
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
 
 load_dotenv()
 
@@ -21,6 +24,66 @@ DB_NAME = os.getenv("MONGODB_DB", "Maleyzal_Horizon_Global_Index")
 COLLECTION_NAME = os.getenv("MONGODB_COLLECTION", "Standard_Index")
 TIME_FIELD = os.getenv("MONGODB_TIMEFIELD", "Date")
 
+# Only the fields _price_docs_to_df needs — Ticker is already known by the caller.
+# The date is rendered server-side as a YYYY-MM-DD string.
+PRICE_PROJECTION = {
+    "_id": 0, "Open": 1, "High": 1, "Low": 1, "Close": 1, "Volume": 1,
+    "date": {"$dateToString": {"format": "%Y-%m-%d", "date": f"${TIME_FIELD}"}},
+}
+
+# Connection pool — one client per process, shared by engine and data fetcher
+MAX_POOL_SIZE = int(os.getenv("MONGODB_MAX_POOL_SIZE", "200"))
+MIN_POOL_SIZE = int(os.getenv("MONGODB_MIN_POOL_SIZE", "10"))
+MAX_IDLE_TIME_MS = int(os.getenv("MONGODB_MAX_IDLE_TIME_MS", "300000"))
+# Wire compression for large OHLCV batches; pymongo drops any compressor
+# whose optional library (zstandard, python-snappy) is not installed
+COMPRESSORS = os.getenv("MONGODB_COMPRESSORS", "zstd,snappy,zlib")
+
+# engine_state holds a single document with this _id
+ENGINE_STATE_ID = "mhgi_engine"
+
+# Docs per getMore when streaming index history
+HISTORY_BATCH_SIZE = 500
+# index_history dates are BSON dates; reads hand them back as 'YYYY-MM-DD'.
+# $toDate also accepts legacy string dates not yet migrated.
+HISTORY_DATE_STRING = {
+    "$dateToString": {"format": "%Y-%m-%d", "date": {"$toDate": "$date"}}
+}
+# A ticker's full history is a few thousand rows; large batches keep it to a
+# couple of getMore round trips instead of one per ~100 documents
+PRICE_BATCH_SIZE = 2000
+
+# stock_info docs older than this are stale (still used as a last-resort fallback)
+STOCK_INFO_MAX_AGE = timedelta(hours=24)
+
+# Operations per bulk_write call — keeps each batch well under the 16 MB BSON limit
+WRITE_BATCH_SIZE = 1000
+# Skip server-side schema validators on bulk writes of our own generated docs;
+# set MHGI_TRUSTED_WRITES=0 if collection validators must be enforced
+TRUSTED_WRITES = os.getenv("MHGI_TRUSTED_WRITES", "1") == "1"
+# Per-ticker saves kept in flight at once by save_many_tickers
+WRITE_CONCURRENCY = 16
+
+# (collection, keys, options) for every index the app relies on.
+# Price reads filter on Ticker equality, then sort / range on the time field.
+# Following the Equality-Sort-Range rule, equality fields go first — keep that
+# order if more fields are added. Descending reads (latest date) walk the same
+# index backwards, so no second index. engine_state is keyed by _id, which is
+# always indexed.
+_INDEX_SPECS = [
+    ("stock_info", "ticker", {"unique": True}),
+    ("stock_info", "updated_at", {}),
+    ("index_history", "date", {"unique": True}),
+    (COLLECTION_NAME, [("Ticker", 1), (TIME_FIELD, 1)], {"name": "ticker_date"}),
+]
+
+
+@lru_cache(maxsize=65536)
+def _fast_ymd(s: str) -> datetime:
+    """Parse 'YYYY-MM-DD' by slicing — avoids strptime's format machinery.
+    Cached because the same dates repeat across every ticker in a backfill."""
+    return datetime(int(s[0:4]), int(s[5:7]), int(s[8:10]))
+
 
 class MongoDBManager:
     """Async MongoDB connection manager using motor."""
@@ -36,12 +99,26 @@ class MongoDBManager:
             return False
 
         try:
-            self.client = AsyncIOMotorClient(MONGODB_URI, serverSelectionTimeoutMS=10000)
-            await self.client.admin.command("ping")
+            self.client = AsyncIOMotorClient(
+                MONGODB_URI,
+                maxPoolSize=MAX_POOL_SIZE,
+                minPoolSize=MIN_POOL_SIZE,
+                maxIdleTimeMS=MAX_IDLE_TIME_MS,
+                serverSelectionTimeoutMS=5000,
+                retryWrites=True,
+                compressors=COMPRESSORS,
+                zlibCompressionLevel=-1,
+            )
+            # Concurrent pings check out several sockets at once, so the
+            # first bulk ingestion doesn't pay connection/TLS setup per op
+            await asyncio.gather(
+                *[self.client.admin.command("ping") for _ in range(max(1, MIN_POOL_SIZE))]
+            )
             self.db = self.client[DB_NAME]
 
             # Create indexes for regular collections
             await self._create_indexes()
+            await self._migrate_index_history_dates()
 
             logger.info(f"✅ Connected to MongoDB Atlas")
             logger.info(f"   Database: {DB_NAME}")
@@ -54,13 +131,18 @@ class MongoDBManager:
             return False
 
     async def _create_indexes(self):
-        """Create indexes for non-timeseries collections."""
-        try:
-            await self.db.stock_info.create_index("ticker", unique=True)
-            await self.db.engine_state.create_index("key", unique=True)
+        """Create all indexes in _INDEX_SPECS concurrently."""
+        results = await asyncio.gather(
+            *[self.db[coll].create_index(keys, **opts) for coll, keys, opts in _INDEX_SPECS],
+            return_exceptions=True,
+        )
+        failed = False
+        for (coll, _, _), result in zip(_INDEX_SPECS, results):
+            if isinstance(result, Exception):
+                failed = True
+                logger.warning(f"  Index creation warning ({coll}): {result}")
+        if not failed:
             logger.info("  MongoDB indexes created/verified")
-        except Exception as e:
-            logger.warning(f"  Index creation warning: {e}")
 
     async def close(self):
         """Close MongoDB connection."""
@@ -70,6 +152,7 @@ class MongoDBManager:
 
     @property
     def is_connected(self) -> bool:
+        # Plain attribute check — set on connect(), never probes the server
         return self.db is not None
 
     # ─────────── STOCK PRICES (Timeseries Collection) ───────────
@@ -81,18 +164,19 @@ class MongoDBManager:
         try:
             query = {"Ticker": ticker}
             if start_date:
-                query[TIME_FIELD] = {"$gte": datetime.strptime(start_date, "%Y-%m-%d")}
-
-            cursor = self.db[COLLECTION_NAME].find(
-                query, {"_id": 0}
-            ).sort(TIME_FIELD, 1)
-            docs = await cursor.to_list(length=50000)
-
-            # Convert Date back to string for internal use
-            for doc in docs:
-                if TIME_FIELD in doc and isinstance(doc[TIME_FIELD], datetime):
-                    doc["date"] = doc[TIME_FIELD].strftime("%Y-%m-%d")
-            return docs
+                query[TIME_FIELD] = {"$gte": _fast_ymd(start_date)}
+
+            # The ticker_date index serves both the match and the sort; the
+            # server formats the date so no per-doc strftime runs in Python
+            cursor = self.db[COLLECTION_NAME].aggregate(
+                [
+                    {"$match": query},
+                    {"$sort": {TIME_FIELD: 1}},
+                    {"$project": PRICE_PROJECTION},
+                ],
+                batchSize=PRICE_BATCH_SIZE,
+            )
+            return await cursor.to_list(length=50000)
         except Exception as e:
             logger.error(f"Error loading stock prices for {ticker}: {e}")
             return []
@@ -116,70 +200,173 @@ class MongoDBManager:
             logger.error(f"Error getting last price date for {ticker}: {e}")
             return None
 
+    async def get_last_price_dates(self, tickers: list[str]) -> dict[str, str]:
+        """Get the last stored price date for many tickers in one aggregation."""
+        if not self.is_connected or not tickers:
+            return {}
+        try:
+            # Descending sort within each ticker is a backwards walk of the
+            # ticker_date index, so $first is the latest date per ticker
+            pipeline = [
+                {"$match": {"Ticker": {"$in": tickers}}},
+                {"$sort": {"Ticker": 1, TIME_FIELD: -1}},
+                {"$group": {"_id": "$Ticker", "last": {"$first": f"${TIME_FIELD}"}}},
+            ]
+            result = {}
+            async for doc in self.db[COLLECTION_NAME].aggregate(pipeline):
+                last = doc["last"]
+                result[doc["_id"]] = last.strftime("%Y-%m-%d") if isinstance(last, datetime) else str(last)
+            return result
+        except Exception as e:
+            logger.error(f"Error getting last price dates for {len(tickers)} tickers: {e}")
+            return {}
+
+    @staticmethod
+    def _new_price_docs(
+        ticker: str, prices: list[dict], last_date: Optional[str]
+    ) -> list[dict]:
+        """
+        Build timeseries documents for the prices dated after `last_date`.
+        Duplicate dates (overlapping fetch windows) collapse to one doc, last wins.
+        """
+        by_date = {
+            p["date"]: p for p in prices
+            if last_date is None or p["date"] > last_date
+        }
+        return [
+            {
+                TIME_FIELD: _fast_ymd(date_str),
+                "Ticker": ticker,
+                "Open": p.get("open", 0),
+                "High": p.get("high", 0),
+                "Low": p.get("low", 0),
+                "Close": p.get("close", 0),
+                "Volume": p.get("volume", 0),
+            }
+            for date_str, p in by_date.items()
+        ]
+
+    async def _bulk_insert_prices(self, docs: list[dict]) -> int:
+        """
+        Insert price documents as concurrent unordered insert_many batches.
+        Plain inserts are what timeseries buckets handle best (upserts need a
+        recent server). Returns rows inserted.
+        """
+        collection = self.db[COLLECTION_NAME]
+        results = await asyncio.gather(*[
+            collection.insert_many(
+                docs[i : i + WRITE_BATCH_SIZE],
+                ordered=False,
+                bypass_document_validation=TRUSTED_WRITES,
+            )
+            for i in range(0, len(docs), WRITE_BATCH_SIZE)
+        ])
+        return sum(len(r.inserted_ids) for r in results)
+
     async def save_stock_prices(self, ticker: str, prices: list[dict]):
         """
         Insert stock prices into the timeseries collection.
-        Checks for existing dates to avoid duplicates.
+        Only prices dated after the ticker's last stored date are inserted,
+        so existing dates are skipped with a single indexed lookup.
         """
         if not self.is_connected or not prices:
             return
 
         try:
-            # Get existing dates for this ticker
-            existing_dates = set()
-            cursor = self.db[COLLECTION_NAME].find(
-                {"Ticker": ticker},
-                {TIME_FIELD: 1, "_id": 0},
-            )
-            async for doc in cursor:
-                if TIME_FIELD in doc:
-                    if isinstance(doc[TIME_FIELD], datetime):
-                        existing_dates.add(doc[TIME_FIELD].strftime("%Y-%m-%d"))
-                    else:
-                        existing_dates.add(str(doc[TIME_FIELD]))
-
-            # Filter out duplicates and build documents
-            docs_to_insert = []
-            for p in prices:
-                date_str = p.get("date", "")
-                if date_str in existing_dates:
-                    continue
-
-                doc = {
-                    TIME_FIELD: datetime.strptime(date_str, "%Y-%m-%d"),
-                    "Ticker": ticker,
-                    "Open": p.get("open", 0),
-                    "High": p.get("high", 0),
-                    "Low": p.get("low", 0),
-                    "Close": p.get("close", 0),
-                    "Volume": p.get("volume", 0),
-                }
-                docs_to_insert.append(doc)
-
-            if docs_to_insert:
-                await self.db[COLLECTION_NAME].insert_many(docs_to_insert, ordered=False)
-                logger.info(f"  {ticker}: Inserted {len(docs_to_insert)} prices (skipped {len(prices) - len(docs_to_insert)} existing)")
+            docs = self._new_price_docs(ticker, prices, await self.get_last_price_date(ticker))
+            if docs:
+                inserted = await self._bulk_insert_prices(docs)
+                logger.info(f"  {ticker}: Inserted {inserted} prices (skipped {len(prices) - inserted} existing)")
             else:
                 logger.info(f"  {ticker}: All prices already in DB, nothing to insert")
 
         except Exception as e:
             logger.error(f"Error saving stock prices for {ticker}: {e}")
 
+    async def save_many_tickers(
+        self, per_ticker: dict[str, list[dict]], concurrency: int = WRITE_CONCURRENCY
+    ):
+        """
+        Save several tickers' prices concurrently via save_stock_prices.
+        A semaphore bounds the in-flight saves so they share the pool instead
+        of serializing one round-trip per ticker.
+        """
+        if not self.is_connected or not per_ticker:
+            return
+
+        sem = asyncio.Semaphore(concurrency)
+
+        async def _one(ticker: str, prices: list[dict]):
+            async with sem:
+                await self.save_stock_prices(ticker, prices)
+
+        await asyncio.gather(*[_one(t, p) for t, p in per_ticker.items()])
+
+    async def _new_price_docs_multi(
+        self, prices_by_ticker: dict[str, list[dict]], last_dates: Optional[dict[str, str]]
+    ) -> list[dict]:
+        """New-price documents for many tickers; last dates come from one aggregation."""
+        if last_dates is None:
+            last_dates = await self.get_last_price_dates(list(prices_by_ticker))
+        return [
+            doc
+            for ticker, prices in prices_by_ticker.items()
+            for doc in self._new_price_docs(ticker, prices, last_dates.get(ticker))
+        ]
+
+    async def save_stock_prices_multi(
+        self,
+        prices_by_ticker: dict[str, list[dict]],
+        last_dates: Optional[dict[str, str]] = None,
+    ) -> Optional[int]:
+        """
+        Insert stock prices for many tickers at once.
+        All tickers' new rows are flattened into shared insert_many batches
+        instead of one round-trip (or more) per ticker. Pass `last_dates`
+        (from get_last_price_dates) when the caller already has them.
+        Returns rows inserted, or None if the write failed.
+        """
+        if not self.is_connected:
+            return None
+        if not prices_by_ticker:
+            return 0
+
+        try:
+            docs = await self._new_price_docs_multi(prices_by_ticker, last_dates)
+            if not docs:
+                return 0
+            inserted = await self._bulk_insert_prices(docs)
+            total = sum(len(p) for p in prices_by_ticker.values())
+            logger.info(
+                f"  Inserted {inserted} prices for {len(prices_by_ticker)} tickers "
+                f"(skipped {total - inserted} existing)"
+            )
+            return inserted
+        except Exception as e:
+            logger.error(f"Error saving stock prices for {len(prices_by_ticker)} tickers: {e}")
+            return None
+
     async def get_all_tickers_summary(self) -> dict:
-        """Get a summary of stored data: {ticker: {count, first_date, last_date}}."""
+        """Get a summary of stored data: {ticker: {count, first_date, last_date}}.
+        Grouped and sorted server-side; the returned dict is already ordered by ticker.
+        """
         if not self.is_connected:
             return {}
         try:
+            # Sorting on (Ticker, Date) first lets the server walk the
+            # ticker_date index, so first/last date per ticker are just the
+            # group's first/last entries instead of a $min/$max over all docs.
             pipeline = [
+                {"$sort": {"Ticker": 1, TIME_FIELD: 1}},
                 {"$group": {
                     "_id": "$Ticker",
                     "count": {"$sum": 1},
-                    "first_date": {"$min": f"${TIME_FIELD}"},
-                    "last_date": {"$max": f"${TIME_FIELD}"},
+                    "first_date": {"$first": f"${TIME_FIELD}"},
+                    "last_date": {"$last": f"${TIME_FIELD}"},
                 }},
                 {"$sort": {"_id": 1}},
             ]
-            cursor = self.db[COLLECTION_NAME].aggregate(pipeline)
+            cursor = self.db[COLLECTION_NAME].aggregate(pipeline, allowDiskUse=True)
             result = {}
             async for doc in cursor:
                 ticker = doc["_id"]
@@ -196,44 +383,91 @@ class MongoDBManager:
 
     # ─────────── INDEX HISTORY (regular collection) ───────────
 
+    async def _migrate_index_history_dates(self):
+        """
+        Convert index_history dates stored as 'YYYY-MM-DD' strings to BSON
+        dates in place. Runs on connect before any history write, so a day
+        never exists in both forms under the unique date index.
+        """
+        try:
+            result = await self.db.index_history.update_many(
+                {"date": {"$type": "string"}},
+                [{"$set": {"date": {"$toDate": "$date"}}}],
+            )
+            if result.modified_count:
+                logger.info(f"  Migrated {result.modified_count} index history dates to BSON dates")
+        except Exception as e:
+            logger.warning(f"  Index history date migration warning: {e}")
+
+    @staticmethod
+    def _history_doc(entry: dict) -> dict:
+        """Copy of a history entry with its date as a BSON datetime."""
+        return {**entry, "date": _fast_ymd(entry["date"])}
+
     async def save_index_history_entry(self, entry: dict):
         """Upsert a single index history entry."""
         if not self.is_connected:
             return
         try:
+            doc = self._history_doc(entry)
             await self.db.index_history.update_one(
-                {"date": entry["date"]},
-                {"$set": entry},
+                {"date": doc["date"]},
+                {"$set": doc},
                 upsert=True,
             )
         except Exception as e:
             logger.error(f"Error saving index history: {e}")
 
-    async def save_index_history_bulk(self, entries: list[dict]):
-        """Bulk upsert index history entries."""
-        if not self.is_connected or not entries:
-            return
+    async def save_index_history_bulk(self, entries: list[dict]) -> bool:
+        """Bulk upsert index history entries. Returns False if the write failed."""
+        if not self.is_connected:
+            return False
+        if not entries:
+            return True
         try:
-            from pymongo import UpdateOne
-
-            ops = [
-                UpdateOne({"date": e["date"]}, {"$set": e}, upsert=True)
-                for e in entries
-            ]
-            result = await self.db.index_history.bulk_write(ops, ordered=False)
+            # One op per date, last wins — duplicate $set upserts in an
+            # unordered batch would otherwise apply in arbitrary order
+            by_date = {e["date"]: e for e in entries}
+            ops = []
+            for e in by_date.values():
+                doc = self._history_doc(e)
+                ops.append(UpdateOne({"date": doc["date"]}, {"$set": doc}, upsert=True))
+            result = await self.db.index_history.bulk_write(
+                ops, ordered=False, bypass_document_validation=TRUSTED_WRITES
+            )
             logger.info(
                 f"  Saved {result.upserted_count} new + {result.modified_count} updated index history entries"
             )
+            return True
         except Exception as e:
             logger.error(f"Error in bulk save index history: {e}")
+            return False
+
+    def _history_cursor(self, query: dict):
+        """Date-ordered history cursor with dates rendered back to 'YYYY-MM-DD'."""
+        return self.db.index_history.aggregate(
+            [
+                {"$match": query},
+                {"$sort": {"date": 1}},
+                {"$set": {"date": HISTORY_DATE_STRING}},
+                {"$unset": "_id"},
+            ],
+            batchSize=HISTORY_BATCH_SIZE,
+        )
+
+    async def iter_index_history(self) -> AsyncIterator[dict]:
+        """Stream all index history in date order, 500 docs per batch."""
+        if not self.is_connected:
+            return
+        async for doc in self._history_cursor({}):
+            yield doc
 
     async def load_index_history(self) -> list[dict]:
-        """Load all index history."""
+        """Load all index history (no length cap)."""
         if not self.is_connected:
             return []
         try:
-            cursor = self.db.index_history.find({}, {"_id": 0}).sort("date", 1)
-            return await cursor.to_list(length=10000)
+            return [doc async for doc in self.iter_index_history()]
         except Exception as e:
             logger.error(f"Error loading index history: {e}")
             return []
@@ -246,7 +480,10 @@ class MongoDBManager:
             doc = await self.db.index_history.find_one(
                 {}, {"date": 1, "_id": 0}, sort=[("date", -1)]
             )
-            return doc["date"] if doc else None
+            if not doc:
+                return None
+            last = doc["date"]
+            return last.strftime("%Y-%m-%d") if isinstance(last, datetime) else last
         except Exception as e:
             logger.error(f"Error getting last history date: {e}")
             return None
@@ -260,55 +497,75 @@ class MongoDBManager:
         try:
             await self.db.stock_info.update_one(
                 {"ticker": ticker},
-                {"$set": {**info, "ticker": ticker, "updated_at": datetime.now().isoformat()}},
+                {"$set": {**info, "ticker": ticker, "updated_at": datetime.now()}},
                 upsert=True,
             )
         except Exception as e:
             logger.error(f"Error saving stock info for {ticker}: {e}")
 
+    @staticmethod
+    def _stock_info_query(tickers, allow_stale: bool) -> dict:
+        """
+        Build the stock_info filter. Unless stale docs are allowed, only docs
+        updated within STOCK_INFO_MAX_AGE match, so the freshness check runs
+        server-side and stale docs are never transferred. (Legacy docs with a
+        string updated_at never match and get refreshed from yfinance.)
+        """
+        query = {"ticker": tickers if isinstance(tickers, str) else {"$in": tickers}}
+        if not allow_stale:
+            query["updated_at"] = {"$gte": datetime.now() - STOCK_INFO_MAX_AGE}
+        return query
+
     async def load_stock_info(self, ticker: str, allow_stale: bool = False) -> Optional[dict]:
         """Load stock info. Returns cached data even if stale when allow_stale=True."""
         if not self.is_connected:
             return None
         try:
-            doc = await self.db.stock_info.find_one({"ticker": ticker}, {"_id": 0})
-            if doc:
-                if not allow_stale:
-                    updated = doc.get("updated_at")
-                    if updated:
-                        updated_dt = datetime.fromisoformat(updated)
-                        age_hours = (datetime.now() - updated_dt).total_seconds() / 3600
-                        if age_hours > 24:
-                            return None
-                return doc
-            return None
+            return await self.db.stock_info.find_one(
+                self._stock_info_query(ticker, allow_stale), {"_id": 0}
+            )
         except Exception as e:
             logger.error(f"Error loading stock info for {ticker}: {e}")
             return None
 
+    async def load_stock_info_many(self, tickers: list[str], allow_stale: bool = False) -> dict:
+        """Load stock info for many tickers in a single query: {ticker: doc}."""
+        if not self.is_connected or not tickers:
+            return {}
+        try:
+            cursor = self.db.stock_info.find(
+                self._stock_info_query(tickers, allow_stale), {"_id": 0}
+            )
+            return {doc["ticker"]: doc async for doc in cursor}
+        except Exception as e:
+            logger.error(f"Error loading stock info for {len(tickers)} tickers: {e}")
+            return {}
+
     # ─────────── ENGINE STATE ───────────
 
     async def save_engine_state(self, state: dict):
-        """Save engine state."""
+        """Save engine state (single doc, keyed by _id)."""
         if not self.is_connected:
             return
         try:
             await self.db.engine_state.update_one(
-                {"key": "mhgi_engine"},
-                {"$set": {**state, "key": "mhgi_engine", "updated_at": datetime.now().isoformat()}},
+                {"_id": ENGINE_STATE_ID},
+                {"$set": {**state, "updated_at": datetime.now()}},
                 upsert=True,
             )
         except Exception as e:
             logger.error(f"Error saving engine state: {e}")
 
     async def load_engine_state(self) -> Optional[dict]:
-        """Load engine state."""
+        """Load engine state via an _id point read."""
         if not self.is_connected:
             return None
         try:
-            return await self.db.engine_state.find_one(
-                {"key": "mhgi_engine"}, {"_id": 0}
-            )
+            state = await self.db.engine_state.find_one({"_id": ENGINE_STATE_ID}, {"_id": 0})
+            if state is None:
+                # Docs written before the _id switch were keyed by a "key" field
+                state = await self.db.engine_state.find_one({"key": ENGINE_STATE_ID}, {"_id": 0})
+            return state
         except Exception as e:
             logger.error(f"Error loading engine state: {e}")
             return None
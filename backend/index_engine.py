@@ -46,13 +46,15 @@ Methodology (aligned with MSCI / FTSE / S&P Dow Jones):
 
 Persistence: MongoDB Atlas (with JSON fallback).
 """
-import json
+import asyncio
+import hashlib
 import logging
 from datetime import datetime, date, timedelta
 from pathlib import Path
 from typing import Optional
 
 import numpy as np
+import orjson
 import pandas as pd
 
 from data_fetcher import data_fetcher
@@ -61,7 +63,49 @@ from models import ConstituentInfo, IndexValue, IndexHistoryPoint, IndexSnapshot
 logger = logging.getLogger("mhgi.index_engine")
 
 CONFIG_PATH = Path(__file__).parent / "constituents.json"
-HISTORY_PATH = Path(__file__).parent / "index_history.json"
+# JSON fallback: one history entry per line, appended as entries change and
+# compacted back to the last HISTORY_BACKUP_ROWS entries once it doubles
+HISTORY_PATH = Path(__file__).parent / "index_history.ndjson"
+LEGACY_HISTORY_PATH = Path(__file__).parent / "index_history.json"
+HISTORY_BACKUP_ROWS = 3650
+# Distinct `days` values kept in the /api/history response cache
+HISTORY_CACHE_SIZE = 16
+
+
+def _ff_mcap_totals(
+    price_mat: np.ndarray, shares: np.ndarray, ff: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Per-date totals over a (dates × tickers) price matrix, given per-ticker
+    `shares` and `ff` vectors. NaN prices are excluded.
+
+    Returns (valid_count, Σ FF_MCap, Σ MCap), one value per date.
+    """
+    valid = ~np.isnan(price_mat)
+    # Each daily total is a dot product. Both series come from one
+    # (dates × tickers) @ (tickers × 2) product, so the price matrix is read
+    # once (missing prices → 0)
+    prices = np.where(valid, price_mat, 0)
+    weights = np.stack([shares * ff, shares], axis=1)
+    totals = prices @ weights
+    return valid.sum(axis=1), totals[:, 0], totals[:, 1]
+
+
+def _eod_ff_mcap(
+    prices: np.ndarray,
+    shares: np.ndarray,
+    ff: np.ndarray,
+    mcap_out: np.ndarray,
+    ff_mcap_out: np.ndarray,
+) -> tuple[float, float]:
+    """
+    Per-constituent MCap and FF MCap for one day, written into preallocated
+    buffers (no temporaries), plus their NaN-skipping totals.
+    Returns (Σ MCap, Σ FF_MCap).
+    """
+    np.multiply(prices, shares, out=mcap_out)
+    np.multiply(mcap_out, ff, out=ff_mcap_out)
+    return float(np.nansum(mcap_out)), float(np.nansum(ff_mcap_out))
 
 
 class IndexEngine:
@@ -75,15 +119,52 @@ class IndexEngine:
     """
 
     def __init__(self):
+        self.config: dict = {}
+        self._config_mtime: int = 0  # st_mtime_ns of the config last parsed
         self.config = self._load_config()
+        # Constituent configs and tickers (config order); refreshed whenever config changes
+        self._constituents: dict[str, dict] = self.config.get("constituents", {})
+        self._tickers: list[str] = list(self._constituents)
         self.divisor: Optional[float] = None
         self.base_value: float = self.config.get("base_value", 1000)
         self.base_date: str = self.config.get("base_date", "2025-01-02")
+        self._base_dt64 = np.datetime64(self.base_date, "D")
         self.index_history: list[dict] = []
+        # date → position in index_history; rebuilt whenever the list is replaced
+        self._history_date_index: dict[str, int] = {}
+        # Dates added or changed since the last MongoDB / NDJSON history save
+        self._dirty_dates: set[str] = set()
+        self._backup_dates: set[str] = set()
+        # Lines in the NDJSON backup; None forces a full rewrite on next save
+        self._backup_lines: Optional[int] = None
+        # Serialized /api/history/full body and its ETag, plus /api/history
+        # bodies keyed by (days, today); dropped whenever history changes
+        self._full_history_cache: Optional[bytes] = None
+        self._history_etag: Optional[str] = None
+        self._history_json_cache: dict[tuple[int, date], tuple[bytes, str]] = {}
+        # Bumped on every history change; a cache built off the event loop is
+        # only stored if the history did not change while it was being built
+        self._history_version: int = 0
+        # Chart points for index_history (sorted datetime64 timestamps and
+        # IndexHistoryPoint dumps), built on demand
+        self._history_timeline: Optional[tuple[np.ndarray, list[dict]]] = None
         self.last_snapshot: Optional[IndexSnapshot] = None
+        # last_snapshot's index and constituent list, serialized once per EOD
+        self.snapshot_index_json: Optional[bytes] = None
+        self.snapshot_constituents_json: Optional[bytes] = None
+        # WebSocket "initial" message text; depends on the snapshot and history
+        self._ws_initial_text: Optional[str] = None
         self._stocks_info: dict = {}
         self._last_ff_mcap_sum: Optional[float] = None
+        # Per-constituent data as parallel arrays aligned with self.tickers
+        self._shares_arr = np.empty(0, dtype=np.float64)
+        self._ff_arr = np.empty(0, dtype=np.float64)
+        self._name_arr: list[str] = []
+        self._sector_arr: list[str] = []
+        self._mcap_buf = np.empty(0, dtype=np.float64)
+        self._ff_mcap_buf = np.empty(0, dtype=np.float64)
         self._db = None  # MongoDB manager, set via set_db()
+        self._rebuild_arrays()
 
     def set_db(self, db_manager):
         """Inject MongoDB manager."""
@@ -96,58 +177,181 @@ class IndexEngine:
     # ─────────── CONFIG & PERSISTENCE ───────────
 
     def _load_config(self) -> dict:
+        """Parse the constituents config, or return the current one if the file is unchanged."""
         try:
-            with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-                return json.load(f)
+            mtime = CONFIG_PATH.stat().st_mtime_ns
+            if self.config and mtime == self._config_mtime:
+                return self.config
+            config = orjson.loads(CONFIG_PATH.read_bytes())
+            self._config_mtime = mtime
+            return config
         except Exception as e:
             logger.error(f"Failed to load config: {e}")
             return {"constituents": {}, "base_value": 1000, "base_date": "2025-01-02"}
 
-    async def _load_history(self):
-        """Load history from MongoDB (primary) or JSON file (fallback)."""
-        # Try MongoDB first
-        if self.has_db:
-            history = await self._db.load_index_history()
-            if history:
-                self.index_history = history
-                logger.info(f"  Loaded {len(history)} history entries from MongoDB")
-                last = history[-1]
+    def _apply_history(self, history: Optional[list[dict]]):
+        """Use history loaded from MongoDB (primary), else the JSON file (fallback)."""
+        # Prefer MongoDB
+        if history:
+            self.index_history = history
+            self._reindex_history()
+            logger.info(f"  Loaded {len(history)} history entries from MongoDB")
+            last = history[-1]
+            if "divisor" in last:
+                self.divisor = last["divisor"]
+            if "ff_mcap_sum" in last:
+                self._last_ff_mcap_sum = last["ff_mcap_sum"]
+            return
+
+        # Fallback to the NDJSON backup (or the legacy JSON array file)
+        try:
+            if HISTORY_PATH.exists():
+                lines = HISTORY_PATH.read_bytes().splitlines()
+                # Later lines are newer versions of a date — last wins
+                by_date = {}
+                for line in lines:
+                    if line:
+                        entry = orjson.loads(line)
+                        by_date[entry["date"]] = entry
+                self.index_history = sorted(by_date.values(), key=lambda x: x["date"])
+                self._backup_lines = len(lines)
+            elif LEGACY_HISTORY_PATH.exists():
+                self.index_history = orjson.loads(LEGACY_HISTORY_PATH.read_bytes())
+            self._reindex_history()
+            if self.index_history:
+                last = self.index_history[-1]
                 if "divisor" in last:
                     self.divisor = last["divisor"]
                 if "ff_mcap_sum" in last:
                     self._last_ff_mcap_sum = last["ff_mcap_sum"]
-                return
-
-        # Fallback to JSON
-        if HISTORY_PATH.exists():
-            try:
-                with open(HISTORY_PATH, "r", encoding="utf-8") as f:
-                    self.index_history = json.load(f)
-                if self.index_history:
-                    last = self.index_history[-1]
-                    if "divisor" in last:
-                        self.divisor = last["divisor"]
-                    if "ff_mcap_sum" in last:
-                        self._last_ff_mcap_sum = last["ff_mcap_sum"]
-                    logger.info(f"  Loaded {len(self.index_history)} history entries from JSON fallback")
-            except Exception as e:
-                logger.warning(f"Failed to load history: {e}")
-                self.index_history = []
+                logger.info(f"  Loaded {len(self.index_history)} history entries from JSON fallback")
+                # MongoDB had no history — push the JSON copy on next save
+                if self.has_db:
+                    self._dirty_dates.update(h["date"] for h in self.index_history)
+        except Exception as e:
+            logger.warning(f"Failed to load history: {e}")
+            self.index_history = []
+            self._reindex_history()
+
+    def _reindex_history(self):
+        """Rebuild the date → list position map for index_history."""
+        self._history_date_index = {h.get("date"): i for i, h in enumerate(self.index_history)}
+        self._invalidate_history_cache()
+
+    def _invalidate_history_cache(self, keep_timeline: bool = False):
+        """
+        Drop serialized history responses after index_history changes.
+        keep_timeline keeps the parsed chart points, for callers that
+        update them in place (see _append_history_point).
+        """
+        self._history_version += 1
+        self._full_history_cache = None
+        self._history_etag = None
+        self._history_json_cache.clear()
+        if not keep_timeline:
+            self._history_timeline = None
+        self._ws_initial_text = None
+
+    @staticmethod
+    def _history_point(entry: dict, dt: datetime) -> dict:
+        """Validated IndexHistoryPoint dump for one history entry (raises if invalid)."""
+        return IndexHistoryPoint(
+            timestamp=dt,
+            value=entry.get("close", entry.get("value", 0)),
+            open=entry.get("open"),
+            high=entry.get("high"),
+            low=entry.get("low"),
+            close=entry.get("close", entry.get("value")),
+        ).model_dump()
+
+    def _append_history_point(self, entry: dict, dt: datetime):
+        """Extend the parsed chart points with an entry appended to index_history."""
+        if self._history_timeline is None:
+            return
+        ts, points = self._history_timeline
+        dt64 = np.datetime64(dt, "ns")
+        if ts.size and dt64 < ts[-1]:
+            # Out of order — let the next query re-parse everything
+            self._history_timeline = None
+            return
+        try:
+            point = self._history_point(entry, dt)
+        except Exception:
+            return
+        self._history_timeline = (np.append(ts, dt64), points + [point])
+
+    def _get_history_timeline(self) -> tuple[np.ndarray, list[dict]]:
+        """
+        Chart points of index_history, validated and dumped once per change:
+        (sorted datetime64 timestamps, IndexHistoryPoint dicts). Entries whose
+        timestamp or values fail to parse are skipped.
+        """
+        if self._history_timeline is None:
+            version = self._history_version
+            history = self.index_history
+            parsed = pd.to_datetime(
+                [e.get("timestamp", e.get("date", "")) for e in history],
+                errors="coerce",
+                format="ISO8601",
+            )
+            ok = ~parsed.isna()
+            ts_ok = parsed.values[ok]
+            keep, points = [], []
+            for k, (i, dt) in enumerate(zip(np.flatnonzero(ok).tolist(), parsed[ok].to_pydatetime())):
+                try:
+                    points.append(self._history_point(history[i], dt))
+                except Exception:
+                    continue
+                keep.append(k)
+            timeline = (ts_ok[keep], points)
+            if version != self._history_version:
+                return timeline
+            self._history_timeline = timeline
+        return self._history_timeline
+
+    def _history_points(self, days: int) -> list[dict]:
+        """Cached chart point dicts for the last `days` days."""
+        # History is sorted by date, so the cutoff is a binary search
+        ts, points = self._get_history_timeline()
+        cutoff = np.datetime64(datetime.now() - timedelta(days=days))
+        return points[int(np.searchsorted(ts, cutoff)):]
 
     async def _save_history(self):
-        """Save history to MongoDB (primary) and JSON file (backup)."""
+        """
+        Save history to MongoDB (primary) and JSON file (backup).
+        Only entries whose dates are marked dirty are upserted to MongoDB.
+        """
         # Save to MongoDB
-        if self.has_db:
-            await self._db.save_index_history_bulk(self.index_history)
+        if self.has_db and self._dirty_dates:
+            pos = self._history_date_index
+            dirty = [self.index_history[pos[d]] for d in self._dirty_dates if d in pos]
+            if await self._db.save_index_history_bulk(dirty):
+                self._dirty_dates.clear()
 
-        # Also save to JSON as backup
+        # Also save to NDJSON as backup
         try:
-            trimmed = self.index_history[-3650:]
-            with open(HISTORY_PATH, "w", encoding="utf-8") as f:
-                json.dump(trimmed, f, default=str, indent=2)
+            self._save_history_backup()
         except Exception as e:
             logger.error(f"Failed to save history to JSON: {e}")
 
+    def _save_history_backup(self):
+        """Append changed entries to the NDJSON backup, compacting when it grows too long."""
+        pos = self._history_date_index
+        changed = [self.index_history[pos[d]] for d in sorted(self._backup_dates) if d in pos]
+        if self._backup_lines is None or self._backup_lines + len(changed) > 2 * HISTORY_BACKUP_ROWS:
+            trimmed = self.index_history[-HISTORY_BACKUP_ROWS:]
+            HISTORY_PATH.write_bytes(b"".join(self._ndjson_line(h) for h in trimmed))
+            self._backup_lines = len(trimmed)
+        elif changed:
+            with open(HISTORY_PATH, "ab") as f:
+                f.write(b"".join(self._ndjson_line(h) for h in changed))
+            self._backup_lines += len(changed)
+        self._backup_dates.clear()
+
+    @staticmethod
+    def _ndjson_line(entry: dict) -> bytes:
+        return orjson.dumps(entry, option=orjson.OPT_SERIALIZE_NUMPY, default=str) + b"\n"
+
     async def _save_engine_state(self):
         """Persist engine state (divisor, etc.) to MongoDB."""
         if self.has_db:
@@ -160,36 +364,96 @@ class IndexEngine:
                 "last_history_date": self.index_history[-1]["date"] if self.index_history else None,
             })
 
-    async def _load_engine_state(self):
-        """Load engine state from MongoDB."""
-        if self.has_db:
-            state = await self._db.load_engine_state()
-            if state:
-                if self.divisor is None and "divisor" in state:
-                    self.divisor = state["divisor"]
-                if self._last_ff_mcap_sum is None and "last_ff_mcap_sum" in state:
-                    self._last_ff_mcap_sum = state["last_ff_mcap_sum"]
-                logger.info(f"  Engine state loaded from MongoDB (divisor: {self.divisor})")
+    def _apply_engine_state(self, state: Optional[dict]):
+        """Apply engine state loaded from MongoDB."""
+        if state:
+            if self.divisor is None and "divisor" in state:
+                self.divisor = state["divisor"]
+            if self._last_ff_mcap_sum is None and "last_ff_mcap_sum" in state:
+                self._last_ff_mcap_sum = state["last_ff_mcap_sum"]
+            logger.info(f"  Engine state loaded from MongoDB (divisor: {self.divisor})")
 
     @property
     def tickers(self) -> list[str]:
-        return list(self.config.get("constituents", {}).keys())
+        return self._tickers
 
     def get_constituent_config(self, ticker: str) -> dict:
-        return self.config.get("constituents", {}).get(ticker, {})
+        return self._constituents.get(ticker) or {}
+
+    def _rebuild_arrays(self):
+        """
+        Rebuild the per-constituent arrays (shares, FIF, name, sector) aligned
+        with self.tickers. Called on config load/reload and once stock info
+        is fetched; hot paths index these instead of walking nested dicts.
+        """
+        tickers = self.tickers
+        configs = [self._constituents[t] for t in tickers]
+        self._ff_arr = np.array(
+            [c.get("free_float_factor", 0.5) for c in configs], dtype=np.float64
+        )
+        self._name_arr = [c.get("name", t) for t, c in zip(tickers, configs)]
+        self._sector_arr = [c.get("sector", "Unknown") for c in configs]
+
+        shares = [self._stocks_info.get(t, {}).get("shares_outstanding", 0) for t in tickers]
+        if self._stocks_info:
+            fallback = [t for t, n in zip(tickers, shares) if not n]
+            if fallback:
+                logger.warning(f"Using fallback shares (1B) for {len(fallback)} tickers: {', '.join(fallback)}")
+        self._shares_arr = np.array([n or 1_000_000_000 for n in shares], dtype=np.float64)
+        # Output buffers for _eod_ff_mcap, reused across EOD runs
+        self._mcap_buf = np.empty(len(tickers), dtype=np.float64)
+        self._ff_mcap_buf = np.empty(len(tickers), dtype=np.float64)
 
     def reload_config(self):
         """Reload config and adjust divisor if constituents changed."""
-        old_tickers = set(self.tickers)
-        self.config = self._load_config()
-        new_tickers = set(self.tickers)
+        config = self._load_config()
+        if config is self.config:
+            return
+        old_tickers = self.tickers
+        old_shares_ff = self._shares_arr * self._ff_arr
+        self.config = config
+        self._constituents = config.get("constituents", {})
+        self._tickers = list(self._constituents)
+        self._rebuild_arrays()
+        new_shares_ff = self._shares_arr * self._ff_arr
 
-        added = new_tickers - old_tickers
-        removed = old_tickers - new_tickers
+        added = set(self.tickers) - set(old_tickers)
+        removed = set(old_tickers) - set(self.tickers)
 
         if added or removed:
             logger.info(f"Constituent change detected. Added: {added}, Removed: {removed}")
+        elif np.array_equal(old_shares_ff, new_shares_ff):
+            return
+        self._rescale_divisor(old_tickers, old_shares_ff, new_shares_ff)
+
+    def _rescale_divisor(
+        self, old_tickers: list[str], old_shares_ff: np.ndarray, new_shares_ff: np.ndarray
+    ):
+        """
+        Keep the index level continuous across a config change: value the old
+        and new constituent sets (shares × FIF) at the last snapshot's prices.
+        Tickers without a snapshot price are left out of both sums, as they
+        were left out of the snapshot itself.
+        """
+        if self.last_snapshot is None:
             logger.info("Divisor will be adjusted on next calculation to maintain continuity.")
+            return
+        last_prices = {c.ticker: c.price for c in self.last_snapshot.constituents}
+        old_set = set(old_tickers)
+        missing = [t for t in self.tickers if t not in old_set and t not in last_prices]
+        if missing:
+            logger.warning(f"Divisor not adjusted — no last price for added {missing}")
+            return
+        old_prices = np.fromiter(
+            (last_prices.get(t, np.nan) for t in old_tickers), dtype=np.float64, count=len(old_tickers)
+        )
+        new_prices = np.fromiter(
+            (last_prices.get(t, np.nan) for t in self.tickers), dtype=np.float64, count=len(self.tickers)
+        )
+        self.adjust_divisor_for_constituent_change(
+            float(np.nansum(old_prices * old_shares_ff)),
+            float(np.nansum(new_prices * new_shares_ff)),
+        )
 
     # ─────────── INITIALIZATION ───────────
 
@@ -203,25 +467,33 @@ class IndexEngine:
         logger.info(f"  Database: {'MongoDB Atlas ✅' if self.has_db else 'JSON fallback ⚠️'}")
         logger.info("═" * 50)
 
-        # Load saved state from MongoDB
-        await self._load_engine_state()
-        await self._load_history()
+        tickers = self.tickers
 
-        # Fetch fundamental data (with MongoDB caching)
+        # Engine state, history and fundamental data (with MongoDB caching)
+        # are independent round-trips, so load them concurrently
         if self.has_db:
-            self._stocks_info = await data_fetcher.fetch_stocks_info_async(self.tickers)
+            state, history, self._stocks_info = await asyncio.gather(
+                self._db.load_engine_state(),
+                self._db.load_index_history(),
+                data_fetcher.fetch_stocks_info_async(tickers),
+            )
         else:
-            self._stocks_info = data_fetcher.fetch_stocks_info(self.tickers)
-
-        for ticker in self.tickers:
-            info = self._stocks_info.get(ticker, {})
-            config = self.get_constituent_config(ticker)
-            shares = info.get("shares_outstanding", 0)
-            ff = config.get("free_float_factor", 0.5)
-            logger.info(
-                f"  {ticker:<12} | Shares: {shares:>15,.0f} | FIF: {ff:.3f} | "
-                f"{config.get('name', ticker)}"
+            state, history = None, None
+            self._stocks_info = await asyncio.to_thread(
+                data_fetcher.fetch_stocks_info, tickers
             )
+        # State first: history's last entry overrides the saved divisor
+        self._apply_engine_state(state)
+        self._apply_history(history)
+        self._rebuild_arrays()
+
+        # Per-ticker table — skip the formatting entirely when INFO is filtered
+        if logger.isEnabledFor(logging.INFO) and tickers:
+            logger.info("\n".join(
+                f"  {ticker:<12} | Shares: {self._shares_arr[i]:>15,.0f} | "
+                f"FIF: {self._ff_arr[i]:.3f} | {self._name_arr[i]}"
+                for i, ticker in enumerate(tickers)
+            ))
 
         # Calculate base divisor if not saved
         if self.divisor is None:
@@ -245,36 +517,35 @@ class IndexEngine:
         else:
             historical = data_fetcher.fetch_historical(self.tickers, period="max", interval="1d")
 
-        base_ff_mcap_sum = 0
-
-        for ticker in self.tickers:
+        tickers = self.tickers
+        base_prices = np.full(len(tickers), np.nan)
+        no_data = []
+        for i, ticker in enumerate(tickers):
             if ticker not in historical or historical[ticker].empty:
-                logger.warning(f"  No historical data for {ticker}, skipping base calc")
+                no_data.append(ticker)
                 continue
 
+            # Last close on or before the base date (binary search on the
+            # sorted datetime64 index), else the first available close
             df = historical[ticker]
-            df.index = pd.to_datetime(df.index)
-            target = pd.Timestamp(self.base_date)
+            closes = df["Close"].to_numpy()
+            pos = df.index.values.searchsorted(self._base_dt64, side="right") - 1
+            base_prices[i] = closes[pos] if pos >= 0 else closes[0]
 
-            if target in df.index:
-                base_price = float(df.loc[target, "Close"])
-            else:
-                mask = df.index <= target
-                if mask.any():
-                    base_price = float(df.loc[mask].iloc[-1]["Close"])
-                else:
-                    base_price = float(df.iloc[0]["Close"])
-
-            config = self.get_constituent_config(ticker)
-            ff_factor = config.get("free_float_factor", 0.5)
-            shares = self._get_shares(ticker)
-            ff_mcap = base_price * shares * ff_factor
-            base_ff_mcap_sum += ff_mcap
-
-            logger.info(
-                f"  {ticker:<12} | Base Price: {base_price:>10,.0f} | "
-                f"FF MCap: {ff_mcap:>18,.0f}"
-            )
+        if no_data:
+            logger.warning(f"  No historical data for {', '.join(no_data)}, skipping in base calc")
+
+        # Σ FF_MCap(t₀) across all constituents at once; no data contributes 0
+        ff_mcap = np.nan_to_num(base_prices) * self._shares_arr * self._ff_arr
+        base_ff_mcap_sum = float(ff_mcap.sum())
+
+        priced = np.flatnonzero(~np.isnan(base_prices))
+        if logger.isEnabledFor(logging.INFO) and priced.size:
+            logger.info("\n".join(
+                f"  {tickers[i]:<12} | Base Price: {base_prices[i]:>10,.0f} | "
+                f"FF MCap: {ff_mcap[i]:>18,.0f}"
+                for i in priced
+            ))
 
         if base_ff_mcap_sum > 0:
             self.divisor = base_ff_mcap_sum / self.base_value
@@ -288,16 +559,6 @@ class IndexEngine:
         # Save state
         await self._save_engine_state()
 
-    def _get_shares(self, ticker: str) -> float:
-        """Get shares outstanding for a ticker with fallback."""
-        shares = 0
-        if ticker in self._stocks_info:
-            shares = self._stocks_info[ticker].get("shares_outstanding", 0)
-        if shares == 0:
-            shares = 1_000_000_000
-            logger.warning(f"Using fallback shares (1B) for {ticker}")
-        return shares
-
     # ─────────── DAILY EOD CALCULATION ───────────
 
     async def calculate_eod_index(self) -> Optional[IndexSnapshot]:
@@ -319,55 +580,68 @@ class IndexEngine:
                 logger.warning("No prices fetched, returning last snapshot")
                 return self.last_snapshot
 
-            constituents: list[ConstituentInfo] = []
-            constituent_data = []
-            total_ff_mcap = 0.0
-            total_mcap = 0.0
-
-            for ticker in self.tickers:
-                config = self.get_constituent_config(ticker)
-                if ticker not in prices:
-                    logger.warning(f"  {ticker}: No price data available")
-                    continue
-
-                price_data = prices[ticker]
-                price = price_data["price"]
-                ff_factor = config.get("free_float_factor", 0.5)
-                shares = self._get_shares(ticker)
-
-                mcap = price * shares
-                ff_mcap = mcap * ff_factor
-
-                total_ff_mcap += ff_mcap
-                total_mcap += mcap
-
-                constituent_data.append({
-                    "ticker": ticker,
-                    "name": config.get("name", ticker),
-                    "sector": config.get("sector", "Unknown"),
-                    "price": price,
-                    "change_percent": price_data.get("change_percent", 0),
-                    "market_cap": mcap,
-                    "free_float_market_cap": ff_mcap,
-                    "free_float_factor": ff_factor,
-                    "shares_outstanding": shares,
-                    "volume": price_data.get("volume", 0),
-                })
-
-                logger.info(
-                    f"  {ticker:<12} | Close: {price:>10,.0f} | "
-                    f"FF MCap: {ff_mcap:>18,.0f} | FIF: {ff_factor:.3f}"
+            # Vectorized FF MCap: one price array aligned with self.tickers,
+            # NaN where no price was fetched
+            tickers = self.tickers
+            price_arr = np.fromiter(
+                (prices[t]["price"] if t in prices else np.nan for t in tickers),
+                dtype=np.float64,
+                count=len(tickers),
+            )
+            valid = ~np.isnan(price_arr)
+            mcap, ff_mcap = self._mcap_buf, self._ff_mcap_buf
+            total_mcap, total_ff_mcap = _eod_ff_mcap(
+                price_arr, self._shares_arr, self._ff_arr, mcap, ff_mcap
+            )
+            if total_ff_mcap > 0:
+                weights = np.round(ff_mcap * (100.0 / total_ff_mcap), 4)
+            else:
+                weights = np.zeros(len(tickers))
+
+            missing = np.flatnonzero(~valid)
+            if missing.size:
+                logger.warning(f"  No price data available for {', '.join(tickers[i] for i in missing)}")
+
+            # Arrays as Python lists (no NumPy scalar boxing per element);
+            # the only per-ticker dict access left is the fetched price data
+            rows = np.flatnonzero(valid).tolist()
+            price_l = price_arr.tolist()
+            mcap_l = mcap.tolist()
+            ff_mcap_l = ff_mcap.tolist()
+            weight_l = weights.tolist()
+            ff_l = self._ff_arr.tolist()
+            shares_l = self._shares_arr.tolist()
+            names = self._name_arr
+            sectors = self._sector_arr
+
+            constituents: list[ConstituentInfo] = [
+                ConstituentInfo(
+                    ticker=tickers[i],
+                    name=names[i],
+                    sector=sectors[i],
+                    price=price_l[i],
+                    change_percent=prices[tickers[i]].get("change_percent", 0),
+                    market_cap=mcap_l[i],
+                    free_float_market_cap=ff_mcap_l[i],
+                    free_float_factor=ff_l[i],
+                    shares_outstanding=shares_l[i],
+                    volume=prices[tickers[i]].get("volume", 0),
+                    weight=weight_l[i],
                 )
+                for i in rows
+            ]
+
+            if logger.isEnabledFor(logging.INFO) and rows:
+                logger.info("\n".join(
+                    f"  {tickers[i]:<12} | Close: {price_l[i]:>10,.0f} | "
+                    f"FF MCap: {ff_mcap_l[i]:>18,.0f} | FIF: {ff_l[i]:.3f}"
+                    for i in rows
+                ))
 
-            if not constituent_data:
+            if not constituents:
                 logger.error("No valid constituent data, aborting calculation")
                 return self.last_snapshot
 
-            for item in constituent_data:
-                weight = (item["free_float_market_cap"] / total_ff_mcap * 100) if total_ff_mcap > 0 else 0
-                item["weight"] = round(weight, 4)
-                constituents.append(ConstituentInfo(**item))
-
             if self.divisor is None or self.divisor == 0:
                 self.divisor = total_ff_mcap / self.base_value if total_ff_mcap > 0 else 1.0
                 logger.info(f"  Initial divisor set: {self.divisor:,.2f}")
@@ -411,13 +685,13 @@ class IndexEngine:
 
             snapshot = IndexSnapshot(index=index_data, constituents=constituents)
             self.last_snapshot = snapshot
+            self.snapshot_index_json = orjson.dumps(index_data.model_dump())
+            self.snapshot_constituents_json = orjson.dumps([c.model_dump() for c in constituents])
+            self._ws_initial_text = None
             self._last_ff_mcap_sum = total_ff_mcap
 
             # Save history entry
-            existing_today = [
-                i for i, h in enumerate(self.index_history)
-                if h.get("date") == today_str
-            ]
+            existing_today = self._history_date_index.get(today_str)
             history_entry = {
                 "date": today_str,
                 "timestamp": now.isoformat(),
@@ -432,24 +706,26 @@ class IndexEngine:
                 "ff_mcap_sum": total_ff_mcap,
                 "total_mcap": total_mcap,
                 "divisor": self.divisor,
-                "num_constituents": len(constituent_data),
+                "num_constituents": len(constituents),
             }
 
-            if existing_today:
-                self.index_history[existing_today[-1]] = history_entry
+            if existing_today is not None:
+                self.index_history[existing_today] = history_entry
+                self._invalidate_history_cache()
                 logger.info(f"  Updated existing entry for {today_str}")
             else:
+                self._history_date_index[today_str] = len(self.index_history)
                 self.index_history.append(history_entry)
+                self._invalidate_history_cache(keep_timeline=True)
+                self._append_history_point(history_entry, now)
                 logger.info(f"  Appended new entry for {today_str}")
+            self._dirty_dates.add(today_str)
+            self._backup_dates.add(today_str)
 
             # Save to MongoDB + JSON
             await self._save_history()
             await self._save_engine_state()
 
-            # Also save individual entry to MongoDB
-            if self.has_db:
-                await self._db.save_index_history_entry(history_entry)
-
             logger.info("  EOD calculation complete ✓")
             return snapshot
 
@@ -506,24 +782,24 @@ class IndexEngine:
         if not historical:
             return []
 
-        # Collect all trading dates
-        all_dates = set()
-        for ticker, df in historical.items():
-            df.index = pd.to_datetime(df.index)
-            all_dates.update(df.index.tolist())
+        # Collect all trading dates on or after the base date (the fetcher
+        # returns DatetimeIndex frames, so this stays in datetime64)
+        all_dates = np.unique(np.concatenate([df.index.values for df in historical.values()]))
+        all_dates = all_dates[all_dates >= self._base_dt64]
 
-        all_dates = sorted(all_dates)
-        base_dt = pd.Timestamp(self.base_date)
-        all_dates = [d for d in all_dates if d >= base_dt]
-
-        if not all_dates:
+        if not all_dates.size:
             return []
 
         # Determine which dates need calculation
-        existing_dates = set(h.get("date") for h in self.index_history)
-        dates_to_calculate = [d for d in all_dates if d.strftime("%Y-%m-%d") not in existing_dates]
+        existing_dates = self._history_date_index
+        new_mask = np.fromiter(
+            (d not in existing_dates for d in np.datetime_as_string(all_dates, unit="D")),
+            dtype=bool,
+            count=all_dates.size,
+        )
+        dates_to_calculate = all_dates[new_mask]
 
-        if not dates_to_calculate and self.index_history:
+        if not dates_to_calculate.size and self.index_history:
             logger.info(f"All {len(existing_dates)} historical dates already calculated")
             return self.index_history
 
@@ -543,77 +819,88 @@ class IndexEngine:
             if "divisor" in last:
                 divisor = last["divisor"]
 
-        new_entries = []
+        # One aligned (dates × tickers) close matrix. Each ticker's series is
+        # reindexed straight onto the dates being calculated with ffill, which
+        # picks its last close on or before every date (NaN before its first).
+        tickers = self.tickers
+        cols = [i for i, t in enumerate(tickers) if t in historical and not historical[t].empty]
+        calc_dates = pd.DatetimeIndex(dates_to_calculate if result else all_dates)
 
-        for dt in (dates_to_calculate if result else all_dates):
-            total_ff_mcap = 0.0
-            total_mcap = 0.0
-            valid_count = 0
-
-            for ticker in self.tickers:
-                if ticker not in historical:
-                    continue
-
-                df = historical[ticker]
-                config = self.get_constituent_config(ticker)
-                ff_factor = config.get("free_float_factor", 0.5)
-                shares = self._get_shares(ticker)
-
-                if dt in df.index:
-                    price = float(df.loc[dt, "Close"])
-                else:
-                    mask = df.index <= dt
-                    if mask.any():
-                        price = float(df.loc[mask].iloc[-1]["Close"])
-                    else:
-                        continue
-
-                mcap = price * shares
-                ff_mcap = mcap * ff_factor
-                total_ff_mcap += ff_mcap
-                total_mcap += mcap
-                valid_count += 1
-
-            if valid_count == 0:
-                continue
-
-            if divisor is None:
-                divisor = total_ff_mcap / self.base_value
-                self.divisor = divisor
-
-            index_val = total_ff_mcap / divisor
-            change = index_val - prev_value
-            change_pct = (change / prev_value * 100) if prev_value > 0 else 0
+        new_entries = []
+        if cols:
+            closes = pd.concat(
+                {
+                    tickers[i]: historical[tickers[i]]["Close"].reindex(
+                        calc_dates, method="ffill"
+                    )
+                    for i in cols
+                },
+                axis=1,
+            )
+            price_mat = closes.to_numpy(dtype=np.float64)
 
-            date_str = dt.strftime("%Y-%m-%d")
+            valid_count, ff_sum, mcap_sum = _ff_mcap_totals(
+                price_mat,
+                self._shares_arr[cols],
+                self._ff_arr[cols],
+            )
 
-            entry = {
-                "date": date_str,
-                "timestamp": dt.isoformat(),
-                "value": round(index_val, 2),
-                "open": round(index_val, 2),
-                "high": round(index_val, 2),
-                "low": round(index_val, 2),
-                "close": round(index_val, 2),
-                "previous_close": round(prev_value, 2),
-                "change": round(change, 2),
-                "change_percent": round(change_pct, 4),
-                "ff_mcap_sum": total_ff_mcap,
-                "total_mcap": total_mcap,
-                "divisor": divisor,
-                "num_constituents": valid_count,
-                "time": int(dt.timestamp()),
-            }
+            # Dates where no constituent has a price yet are skipped
+            rows = np.flatnonzero(valid_count > 0)
+            if rows.size:
+                if divisor is None:
+                    divisor = float(ff_sum[rows[0]]) / self.base_value
+                    self.divisor = divisor
+
+                index_vals = ff_sum[rows] / divisor
+                prev_vals = np.concatenate(([prev_value], index_vals[:-1]))
+                changes = index_vals - prev_vals
+                change_pcts = np.divide(
+                    changes * 100, prev_vals,
+                    out=np.zeros_like(changes), where=prev_vals > 0,
+                )
 
-            new_entries.append(entry)
-            prev_value = index_val
+                # Round whole columns at once, then pull Python scalars out
+                dts = calc_dates[rows]
+                date_strs = dts.strftime("%Y-%m-%d")
+                idx_round = np.round(index_vals, 2).tolist()
+                prev_round = np.round(prev_vals, 2).tolist()
+                chg_round = np.round(changes, 2).tolist()
+                pct_round = np.round(change_pcts, 4).tolist()
+                ff_sums = ff_sum[rows].tolist()
+                mcap_sums = mcap_sum[rows].tolist()
+                counts = valid_count[rows].tolist()
+
+                for k, dt in enumerate(dts):
+                    value = idx_round[k]
+                    new_entries.append({
+                        "date": date_strs[k],
+                        "timestamp": dt.isoformat(),
+                        "value": value,
+                        "open": value,
+                        "high": value,
+                        "low": value,
+                        "close": value,
+                        "previous_close": prev_round[k],
+                        "change": chg_round[k],
+                        "change_percent": pct_round[k],
+                        "ff_mcap_sum": ff_sums[k],
+                        "total_mcap": mcap_sums[k],
+                        "divisor": divisor,
+                        "num_constituents": counts[k],
+                        "time": int(dt.timestamp()),
+                    })
 
         # Merge new entries into result
         if new_entries:
             result.extend(new_entries)
             result.sort(key=lambda x: x["date"])
+            new_dates = [e["date"] for e in new_entries]
+            self._dirty_dates.update(new_dates)
+            self._backup_dates.update(new_dates)
 
         self.index_history = result
+        self._reindex_history()
 
         # Save to MongoDB + JSON
         await self._save_history()
@@ -630,24 +917,79 @@ class IndexEngine:
 
     def get_history(self, days: int = 365) -> list[IndexHistoryPoint]:
         """Get index history for charting."""
-        cutoff = datetime.now().timestamp() - (days * 86400)
-        points = []
-        for entry in self.index_history:
-            try:
-                ts_str = entry.get("timestamp", entry.get("date", ""))
-                ts = datetime.fromisoformat(ts_str) if ts_str else None
-                if ts and ts.timestamp() >= cutoff:
-                    points.append(IndexHistoryPoint(
-                        timestamp=ts,
-                        value=entry.get("close", entry.get("value", 0)),
-                        open=entry.get("open"),
-                        high=entry.get("high"),
-                        low=entry.get("low"),
-                        close=entry.get("close", entry.get("value")),
-                    ))
-            except Exception:
-                continue
-        return points
+        if not self.index_history:
+            return []
+        # Points were validated when cached — rebuild the models without revalidating
+        return [IndexHistoryPoint.model_construct(**p) for p in self._history_points(days)]
+
+    @staticmethod
+    def _json_with_etag(payload: dict) -> tuple[bytes, str]:
+        body = orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY, default=str)
+        return body, f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+    def get_full_history_json(self) -> tuple[bytes, str]:
+        """Serialized full history response and its ETag, cached until history changes."""
+        if self._full_history_cache is None:
+            version = self._history_version
+            history = self.index_history
+            body, etag = self._json_with_etag({
+                "history": history,
+                "count": len(history),
+                "base_date": self.base_date,
+                "base_value": self.base_value,
+            })
+            if version != self._history_version:
+                return body, etag
+            self._full_history_cache, self._history_etag = body, etag
+        return self._full_history_cache, self._history_etag
+
+    async def get_full_history_json_async(self) -> tuple[bytes, str]:
+        """get_full_history_json, serializing in a worker thread on a cache miss."""
+        if self._full_history_cache is not None:
+            return self._full_history_cache, self._history_etag
+        return await asyncio.to_thread(self.get_full_history_json)
+
+    def get_history_json(self, days: int = 365) -> tuple[bytes, str]:
+        """Serialized get_history(days) response and its ETag, cached per day until history changes."""
+        key = (days, date.today())
+        cached = self._history_json_cache.get(key)
+        if cached is None:
+            version = self._history_version
+            points = self._history_points(days) if self.index_history else []
+            cached = self._json_with_etag({"history": points, "count": len(points)})
+            if version == self._history_version:
+                if len(self._history_json_cache) >= HISTORY_CACHE_SIZE:
+                    self._history_json_cache.clear()
+                self._history_json_cache[key] = cached
+        return cached
+
+    async def get_history_json_async(self, days: int = 365) -> tuple[bytes, str]:
+        """get_history_json, building and serializing in a worker thread on a cache miss."""
+        cached = self._history_json_cache.get((days, date.today()))
+        if cached is not None:
+            return cached
+        return await asyncio.to_thread(self.get_history_json, days)
+
+    def get_ws_initial_text(self) -> Optional[str]:
+        """
+        WebSocket "initial" message (snapshot + last 100 history entries),
+        serialized once and shared by every connecting client. None until
+        the first snapshot exists.
+        """
+        if self.last_snapshot is None:
+            return None
+        if self._ws_initial_text is None:
+            self._ws_initial_text = orjson.dumps(
+                {
+                    "type": "initial",
+                    "index": orjson.Fragment(self.snapshot_index_json),
+                    "constituents": orjson.Fragment(self.snapshot_constituents_json),
+                    "history": self.index_history[-100:],
+                },
+                option=orjson.OPT_SERIALIZE_NUMPY,
+                default=str,
+            ).decode()
+        return self._ws_initial_text
 
     def get_index_meta(self) -> dict:
         last_calc = None
@@ -659,8 +1001,10 @@ class IndexEngine:
         next_day = now
         if now.hour >= 17:
             next_day = now + timedelta(days=1)
-        while next_day.weekday() >= 5:
-            next_day += timedelta(days=1)
+        # Saturday (5) → +2 days, Sunday (6) → +1 day, weekdays unchanged
+        wd = next_day.weekday()
+        if wd >= 5:
+            next_day += timedelta(days=7 - wd)
         next_calc = next_day.strftime("%Y-%m-%d") + " 17:00 WIB"
 
         return {
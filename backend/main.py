@@ -10,9 +10,10 @@ import os
 from contextlib import asynccontextmanager
 from datetime import datetime
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Query
+import orjson
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 
 from database import mongodb
 from data_fetcher import data_fetcher
@@ -131,6 +132,14 @@ app.add_middleware(
 # ───────── REST API ENDPOINTS ─────────
 
 
+def _etag_response(request: Request, body: bytes, etag: str) -> Response:
+    """Serve pre-serialized JSON, or 304 when the client already has this version."""
+    headers = {"ETag": etag}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 @app.get("/api/health")
 async def get_health():
     """Health check — returns quickly even during initialization."""
@@ -175,10 +184,13 @@ async def get_index():
             status_code=503,
             content={"error": "Index not yet calculated. Please wait..."},
         )
-    return {
-        "index": snapshot.index.model_dump(),
-        "updated_at": datetime.now().isoformat(),
-    }
+    return Response(
+        content=orjson.dumps({
+            "index": orjson.Fragment(index_engine.snapshot_index_json),
+            "updated_at": datetime.now().isoformat(),
+        }),
+        media_type="application/json",
+    )
 
 
 @app.get("/api/constituents")
@@ -190,34 +202,45 @@ async def get_constituents():
             status_code=503,
             content={"error": "Index not yet calculated."},
         )
-    return {
-        "constituents": [c.model_dump() for c in snapshot.constituents],
-        "total": len(snapshot.constituents),
-    }
+    return Response(
+        content=orjson.dumps({
+            "constituents": orjson.Fragment(index_engine.snapshot_constituents_json),
+            "total": len(snapshot.constituents),
+        }),
+        media_type="application/json",
+    )
 
 
 @app.get("/api/history")
 async def get_history(
+    request: Request,
     days: int = Query(default=365, ge=1, le=3650, description="Number of days of history"),
 ):
     """Get historical index values for charting."""
-    history = index_engine.get_history(days=days)
-    return {
-        "history": [h.model_dump() for h in history],
-        "count": len(history),
-    }
+    body, etag = await index_engine.get_history_json_async(days=days)
+    return _etag_response(request, body, etag)
 
 
 @app.get("/api/history/full")
-async def get_full_history():
+async def get_full_history(request: Request):
     """Get full historical index data from base date."""
-    data = index_engine.index_history
-    return {
-        "history": data,
-        "count": len(data),
-        "base_date": index_engine.base_date,
-        "base_value": index_engine.base_value,
-    }
+    body, etag = await index_engine.get_full_history_json_async()
+    return _etag_response(request, body, etag)
+
+
+@app.get("/api/history/export")
+async def export_history():
+    """Download the full history as indented JSON (the legacy index_history.json layout)."""
+    body = orjson.dumps(
+        index_engine.index_history,
+        option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY,
+        default=str,
+    )
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"Content-Disposition": 'attachment; filename="index_history.json"'},
+    )
 
 
 @app.get("/api/meta")
@@ -249,17 +272,11 @@ async def websocket_endpoint(websocket: WebSocket):
     """WebSocket endpoint for real-time index updates."""
     await ws_manager.connect(websocket)
 
-    # Send current snapshot on connect
-    snapshot = index_engine.last_snapshot
-    if snapshot:
-        import json
-        initial_data = {
-            "type": "initial",
-            "index": snapshot.index.model_dump(),
-            "constituents": [c.model_dump() for c in snapshot.constituents],
-            "history": index_engine.index_history[-100:],
-        }
-        await websocket.send_text(json.dumps(initial_data, default=str))
+    # Send current snapshot on connect (serialized once, shared by all clients;
+    # sent as text because the frontend JSON.parses each message)
+    initial = index_engine.get_ws_initial_text()
+    if initial:
+        await websocket.send_text(initial)
 
     try:
         while True:
@@ -276,4 +293,9 @@ async def websocket_endpoint(websocket: WebSocket):
 if __name__ == "__main__":
     import uvicorn
     port = int(os.environ.get("PORT", 8000))
-    uvicorn.run("main:app", host="0.0.0.0", port=port, reload=True)
+    # permessage-deflate off: broadcasts are infrequent, already-encoded
+    # frames, so per-client zlib costs more CPU than it saves on the wire
+    uvicorn.run(
+        "main:app", host="0.0.0.0", port=port, reload=True,
+        ws_per_message_deflate=False,
+    )
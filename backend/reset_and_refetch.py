@@ -47,7 +47,7 @@ def fetch_ticker_data(ticker: str) -> pd.DataFrame:
         start=FETCH_START_DATE,
         interval="1d",
         progress=False,
-        threads=True,
+        threads=False,  # one ticker — a download thread pool is pure overhead
     )
 
     if data.empty:
@@ -114,7 +114,9 @@ async def process_ticker(mongodb, ticker: str, ticker_num: int, total: int) -> d
 
             logger.info(f"  {progress} {short:<8} Fetching from {FETCH_START_DATE} (attempt {attempt})...")
 
-            data = fetch_ticker_data(ticker)
+            # yf.download blocks — run it in a worker thread so the batch's
+            # tickers download concurrently
+            data = await asyncio.to_thread(fetch_ticker_data, ticker)
 
             if data.empty:
                 if attempt < MAX_RETRIES:
@@ -130,12 +132,9 @@ async def process_ticker(mongodb, ticker: str, ticker_num: int, total: int) -> d
                         "last_date": "N/A",
                     }
 
-            # Convert to price documents
+            # Convert to price documents (saved by the caller per batch)
             prices = dataframe_to_price_docs(data)
 
-            # Save to MongoDB
-            await mongodb.save_stock_prices(ticker, prices)
-
             first_date = prices[0]["date"] if prices else "N/A"
             last_date = prices[-1]["date"] if prices else "N/A"
 
@@ -149,6 +148,7 @@ async def process_ticker(mongodb, ticker: str, ticker_num: int, total: int) -> d
                 "records": len(prices),
                 "first_date": first_date,
                 "last_date": last_date,
+                "prices": prices,
             }
 
         except Exception as e:
@@ -254,35 +254,38 @@ async def reset_and_refetch():
             f"{', '.join([t.replace('.JK', '') for t in batch])} --"
         )
 
-        for j, ticker in enumerate(batch):
-            ticker_num = i + j + 1
-            result = await process_ticker(mongodb, ticker, ticker_num, len(tickers))
+        batch_results = await asyncio.gather(*(
+            process_ticker(mongodb, ticker, i + j + 1, len(tickers))
+            for j, ticker in enumerate(batch)
+        ))
+
+        batch_prices = {}
+        for ticker, result in zip(batch, batch_results):
             results.append(result)
 
             if result["status"] == "success":
+                batch_prices[ticker] = result.pop("prices")
                 total_inserted += result["records"]
                 success_count += 1
             else:
                 fail_count += 1
 
-            # Small delay between tickers within a batch
-            if j < len(batch) - 1:
-                await asyncio.sleep(2)
+        # Save the whole batch to MongoDB concurrently
+        await mongodb.save_many_tickers(batch_prices)
 
         # Delay between batches
         if i + BATCH_SIZE < len(tickers):
             logger.info(f"    (waiting {BATCH_DELAY}s before next batch...)")
             await asyncio.sleep(BATCH_DELAY)
 
-    # -- Step 5: Clear local index_history.json --
-    logger.info("\n  [STEP 5] Clearing local index_history.json...")
-    history_path = Path(__file__).parent / "index_history.json"
-    try:
-        with open(history_path, "w", encoding="utf-8") as f:
-            json.dump([], f)
-        logger.info("    index_history.json reset to []")
-    except Exception as e:
-        logger.error(f"    Error clearing index_history.json: {e}")
+    # -- Step 5: Clear local history backups --
+    logger.info("\n  [STEP 5] Clearing local index history backups...")
+    for name in ("index_history.ndjson", "index_history.json"):
+        try:
+            (Path(__file__).parent / name).unlink(missing_ok=True)
+            logger.info(f"    {name} removed")
+        except Exception as e:
+            logger.error(f"    Error removing {name}: {e}")
 
     # -- Step 6: Final verification --
     logger.info("\n" + "=" * 70)
@@ -340,14 +343,15 @@ async def reset_and_refetch():
         await asyncio.sleep(15)  # Wait 15 seconds before retrying
 
         retry_success = 0
+        recovered = {}
         for ticker in failed_tickers:
             short = ticker.replace(".JK", "")
             try:
                 logger.info(f"    {short:<8} Final retry...")
-                data = fetch_ticker_data(ticker)
+                data = await asyncio.to_thread(fetch_ticker_data, ticker)
                 if not data.empty:
                     prices = dataframe_to_price_docs(data)
-                    await mongodb.save_stock_prices(ticker, prices)
+                    recovered[ticker] = prices
                     logger.info(f"    {short:<8} [OK] {len(prices)} records recovered!")
                     retry_success += 1
                 else:
@@ -356,6 +360,8 @@ async def reset_and_refetch():
                 logger.error(f"    {short:<8} [ERROR] {e}")
             await asyncio.sleep(5)
 
+        await mongodb.save_many_tickers(recovered)
+
         if retry_success > 0:
             logger.info(f"    Recovered {retry_success} tickers in final retry!")
 
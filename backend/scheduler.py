@@ -6,21 +6,27 @@ IHSG trading hours: 09:00–15:00 WIB (Mon–Fri), so 17:00 allows for final
 settlement prices to be published.
 
 The scheduler:
-1. Checks every 60 seconds if it's time to calculate
+1. Sleeps until the next 17:00 trigger (no periodic polling)
 2. Only runs on weekdays (Monday–Friday)
 3. Only runs once per day (tracks last calculation date)
 4. Broadcasts the result via WebSocket to connected clients
 """
 import asyncio
 import logging
-from datetime import datetime, time, timedelta
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+import orjson
 
 logger = logging.getLogger("mhgi.scheduler")
 
 # Schedule: 17:00 WIB (UTC+7) on weekdays
 CALCULATION_HOUR = 17
 CALCULATION_MINUTE = 0
-CHECK_INTERVAL = 60  # seconds
+# A trigger missed by less than this (e.g. startup at 17:01) still runs today
+CALCULATION_WINDOW = timedelta(minutes=2)
+RETRY_INTERVAL = 60  # seconds before retrying a failed calculation
 
 
 class DailyEODScheduler:
@@ -32,6 +38,9 @@ class DailyEODScheduler:
         self._task: asyncio.Task = None
         self._running = False
         self._last_calc_date: str = ""
+        # (snapshot, date, encoded payload) of the last broadcast; holding the
+        # snapshot keeps the identity check valid
+        self._payload_cache: Optional[tuple[object, str, bytes]] = None
 
     async def start(self, engine, ws_manager):
         """Start the daily scheduler."""
@@ -50,70 +59,103 @@ class DailyEODScheduler:
             logger.info(f"  Last calculation: {self._last_calc_date}")
 
     async def stop(self):
-        """Stop the scheduler."""
+        """Stop the scheduler. Safe to call more than once."""
+        if not self._running and self._task is None:
+            return
         self._running = False
-        if self._task:
-            self._task.cancel()
-            try:
-                await self._task
-            except asyncio.CancelledError:
-                pass
+        task, self._task = self._task, None
+        if task:
+            task.cancel()
+            # wait() does not raise the loop task's CancelledError, so only a
+            # cancellation of stop() itself propagates from here
+            await asyncio.wait({task})
+            if not task.cancelled() and task.exception():
+                logger.error(f"Scheduler loop failed: {task.exception()}")
         logger.info("Daily EOD Scheduler stopped")
 
     def _is_weekday(self, dt: datetime) -> bool:
         return dt.weekday() < 5  # Mon=0, Fri=4
 
-    def _is_calculation_time(self, now: datetime) -> bool:
-        """Check if current time matches the 17:00 schedule window."""
-        if not self._is_weekday(now):
-            return False
+    def _next_target(self, now: datetime, today_str: str) -> datetime:
+        """
+        Next weekday 17:00 trigger. Today's trigger counts until the end of
+        CALCULATION_WINDOW, unless today was already calculated.
+        `today_str` is now's "%Y-%m-%d" date, formatted once by the caller.
+        """
+        target = now.replace(
+            hour=CALCULATION_HOUR, minute=CALCULATION_MINUTE, second=0, microsecond=0
+        )
+        if now >= target + CALCULATION_WINDOW or today_str == self._last_calc_date:
+            target += timedelta(days=1)
 
-        target = time(CALCULATION_HOUR, CALCULATION_MINUTE)
-        # Allow a 2-minute window (17:00 – 17:01)
-        current_time = now.time()
-        if current_time.hour == target.hour and current_time.minute <= target.minute + 1:
-            today_str = now.strftime("%Y-%m-%d")
-            return today_str != self._last_calc_date
-        return False
+        while not self._is_weekday(target):
+            target += timedelta(days=1)
+
+        return target
 
     async def _run_loop(self, engine, ws_manager):
-        """Main loop — checks every minute if it's time to calculate."""
+        """Main loop — sleeps until the next trigger, then calculates."""
         while self._running:
             try:
                 now = datetime.now()
+                target = self._next_target(now, now.strftime("%Y-%m-%d"))
+                # Wall clock is read once to place the trigger; the wait itself
+                # runs on the monotonic clock so NTP steps can't shift it
+                deadline = time.monotonic() + (target - now).total_seconds()
+                while (remaining := deadline - time.monotonic()) > 0:
+                    await asyncio.sleep(remaining)
 
-                if self._is_calculation_time(now):
-                    today_str = now.strftime("%Y-%m-%d")
-                    logger.info(f"⏰ Trigger: Daily EOD calculation for {today_str}")
-
-                    snapshot = await engine.calculate_eod_index()
+                today_str = target.strftime("%Y-%m-%d")
+                logger.info("⏰ Trigger: Daily EOD calculation for %s", today_str)
 
-                    if snapshot:
-                        self._last_calc_date = today_str
+                snapshot = await engine.calculate_eod_index()
 
-                        # Broadcast to WebSocket clients
-                        payload = self._build_broadcast_payload(snapshot, today_str)
-                        await ws_manager.broadcast(payload)
+                if snapshot:
+                    self._last_calc_date = today_str
 
-                        logger.info(
-                            f"✅ EOD complete: {snapshot.index.value:.2f} "
-                            f"({snapshot.index.change_percent:+.4f}%) "
-                            f"| Clients notified: {ws_manager.client_count}"
-                        )
-                    else:
-                        logger.error("❌ EOD calculation returned None")
+                    # Broadcast to WebSocket clients
+                    await ws_manager.broadcast(self._encoded_payload(snapshot, today_str))
 
-            except Exception as e:
-                logger.error(f"Scheduler error: {e}", exc_info=True)
+                    # Lazy %-args: nothing is formatted when INFO is filtered
+                    logger.info(
+                        "✅ EOD complete: %.2f (%+.4f%%) | Clients notified: %d",
+                        snapshot.index.value,
+                        snapshot.index.change_percent,
+                        ws_manager.client_count,
+                    )
+                    continue
 
-            await asyncio.sleep(CHECK_INTERVAL)
+                logger.error("❌ EOD calculation returned None")
 
-    def _build_broadcast_payload(self, snapshot, date_str: str) -> dict:
+            except Exception as e:
+                logger.error("Scheduler error: %s", e, exc_info=True)
+
+            # Failed — retry while today's window is still open
+            await asyncio.sleep(RETRY_INTERVAL)
+
+    def _encoded_payload(self, snapshot, date_str: str) -> bytes:
+        """
+        Broadcast payload as JSON bytes, reused when the same snapshot is
+        broadcast again for the same date (e.g. a retry returning the last
+        snapshot).
+        """
+        cached = self._payload_cache
+        if cached is None or cached[0] is not snapshot or cached[1] != date_str:
+            payload = self._build_broadcast_payload(snapshot, date_str, datetime.now())
+            cached = (
+                snapshot,
+                date_str,
+                orjson.dumps(payload, default=str, option=orjson.OPT_SERIALIZE_NUMPY),
+            )
+            self._payload_cache = cached
+        return cached[2]
+
+    def _build_broadcast_payload(self, snapshot, date_str: str, now: datetime) -> dict:
         """Build WebSocket broadcast payload."""
         return {
             "type": "eod_update",
             "date": date_str,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now.isoformat(),
             "index": {
                 "value": snapshot.index.value,
                 "change": snapshot.index.change,
@@ -144,15 +186,7 @@ class DailyEODScheduler:
     def get_next_calculation(self) -> str:
         """Get the next scheduled calculation datetime."""
         now = datetime.now()
-        target = now.replace(hour=CALCULATION_HOUR, minute=CALCULATION_MINUTE, second=0)
-
-        if now >= target or now.strftime("%Y-%m-%d") == self._last_calc_date:
-            target += timedelta(days=1)
-
-        while target.weekday() >= 5:
-            target += timedelta(days=1)
-
-        return target.strftime("%Y-%m-%d %H:%M WIB")
+        return self._next_target(now, now.strftime("%Y-%m-%d")).strftime("%Y-%m-%d %H:%M WIB")
 
     @property
     def last_calc_date(self) -> str:
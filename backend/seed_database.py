@@ -16,9 +16,11 @@ import asyncio
 import json
 import logging
 import sys
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Optional
 
+import numpy as np
 import yfinance as yf
 import pandas as pd
 
@@ -30,6 +32,29 @@ logging.basicConfig(
 )
 logger = logging.getLogger("mhgi.seed")
 
+# Price documents buffered across tickers before one bulk write to MongoDB
+FLUSH_DOCS = 5000
+# Lower-cased yfinance column name → canonical price column
+_CANONICAL = {"close": "Close", "open": "Open", "high": "High", "low": "Low", "volume": "Volume"}
+
+
+def _download_bucket(bucket: list[str], start: Optional[str], end: str) -> dict:
+    """
+    Fetch daily history for several tickers in one threaded yf.download.
+    `start` None fetches the full history. Returns {ticker: DataFrame}.
+    """
+    range_kwargs = {"start": start, "end": end} if start else {"period": "max"}
+    # Worker threads only help with several tickers; a lone one fetches inline
+    data = yf.download(
+        bucket, interval="1d", group_by="ticker",
+        progress=False, threads=len(bucket) > 1, **range_kwargs,
+    )
+    if not isinstance(data.columns, pd.MultiIndex):
+        return {bucket[0]: data} if len(bucket) == 1 else {}
+    # group_by="ticker" puts the ticker on level 0
+    present = set(data.columns.get_level_values(0))
+    return {t: data[t] for t in bucket if t in present}
+
 
 async def seed_database():
     """Main seeding function."""
@@ -69,113 +94,140 @@ async def seed_database():
     total_inserted = 0
     total_skipped = 0
     failed_tickers = []
-
-    # Process in batches of 5 to avoid overwhelming yfinance
-    batch_size = 5
-    for i in range(0, len(tickers), batch_size):
-        batch = tickers[i : i + batch_size]
+    pending: dict[str, list[dict]] = {}
+    pending_docs = 0
+
+    async def flush() -> int:
+        """Write the buffered tickers; returns records inserted, or 0 (tickers failed) on error."""
+        nonlocal pending, pending_docs
+        flushing, pending, pending_docs = pending, {}, 0
+        # Acknowledged, so a server-side rejection is reported here and the
+        # final summary below reads back every write
+        inserted = await mongodb.save_stock_prices_multi(flushing, last_dates)
+        if inserted is None:
+            failed_tickers.extend(flushing)
+            return 0
+        return inserted
+
+    # Fetch start per ticker: day after the last stored date, or None for
+    # full history. Up-to-date tickers are dropped here, before any download.
+    today = datetime.now().strftime("%Y-%m-%d")
+    # One aggregation for all tickers instead of a query per ticker
+    last_dates = await mongodb.get_last_price_dates(tickers)
+    starts: dict[str, Optional[str]] = {}
+    for ticker in tickers:
+        short = ticker.replace(".JK", "")
+        last_date = last_dates.get(ticker)
+        if last_date:
+            start = (datetime.strptime(last_date, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+            if start > today:
+                logger.info(f"  {short:<8} ✓ Already up to date (last: {last_date})")
+                total_skipped += 1
+                continue
+            starts[ticker] = start
+        else:
+            starts[ticker] = None
+    to_fetch = list(starts)
+
+    # Tickers in a batch that share a start date are fetched in one download
+    batch_size = 20
+    for i in range(0, len(to_fetch), batch_size):
+        batch = to_fetch[i : i + batch_size]
         batch_num = i // batch_size + 1
-        total_batches = (len(tickers) + batch_size - 1) // batch_size
+        total_batches = (len(to_fetch) + batch_size - 1) // batch_size
 
         logger.info(f"\n── Batch {batch_num}/{total_batches}: {', '.join([t.replace('.JK', '') for t in batch])} ──")
 
+        buckets: dict[Optional[str], list[str]] = {}
         for ticker in batch:
             short = ticker.replace(".JK", "")
-            try:
-                # Check last date in MongoDB
-                last_date = await mongodb.get_last_price_date(ticker)
-
-                if last_date:
-                    # Incremental: only fetch from day after last stored date
-                    from datetime import timedelta
-                    start = (datetime.strptime(last_date, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
-                    today = datetime.now().strftime("%Y-%m-%d")
-
-                    if start > today:
-                        logger.info(f"  {short:<8} ✓ Already up to date (last: {last_date})")
-                        total_skipped += 1
-                        continue
+            start = starts[ticker]
+            if start:
+                logger.info(f"  {short:<8} Fetching from {start} to {today}...")
+            else:
+                logger.info(f"  {short:<8} Fetching full history (max)...")
+            buckets.setdefault(start, []).append(ticker)
+
+        # Downloads block, so each bucket runs in a worker thread and the
+        # batch's buckets are fetched concurrently
+        downloads = await asyncio.gather(
+            *(asyncio.to_thread(_download_bucket, bucket, start, today)
+              for start, bucket in buckets.items()),
+            return_exceptions=True,
+        )
+        for bucket, frames in zip(buckets.values(), downloads):
+            if isinstance(frames, Exception):
+                logger.error(f"  Download failed for {', '.join(bucket)}: {frames}")
+                failed_tickers.extend(bucket)
+                continue
 
-                    logger.info(f"  {short:<8} Fetching from {start} to {today}...")
-                    data = yf.download(
-                        ticker, start=start, end=today,
-                        interval="1d", progress=False, threads=True,
-                    )
-                else:
-                    # Full fetch
-                    logger.info(f"  {short:<8} Fetching full history (max)...")
-                    data = yf.download(
-                        ticker, period="max", interval="1d",
-                        progress=False, threads=True,
-                    )
+            for ticker in bucket:
+                short = ticker.replace(".JK", "")
+                try:
+                    data = frames.get(ticker)
+                    if data is None or data.empty:
+                        logger.warning(f"  {short:<8} ✗ No data returned from yfinance")
+                        failed_tickers.append(ticker)
+                        continue
 
-                if data.empty:
-                    logger.warning(f"  {short:<8} ✗ No data returned from yfinance")
-                    failed_tickers.append(ticker)
-                    continue
+                    # Ensure standard column names exist
+                    col_map = {
+                        col: _CANONICAL[key]
+                        for col in data.columns
+                        if (key := str(col).lower().strip()) in _CANONICAL
+                    }
+                    if col_map:
+                        data = data.rename(columns=col_map)
+
+                    if "Close" not in data.columns:
+                        logger.warning(f"  {short:<8} ✗ No 'Close' column. Columns: {list(data.columns)}")
+                        failed_tickers.append(ticker)
+                        continue
 
-                # Flatten MultiIndex columns (yfinance returns multi-level for single ticker too)
-                if isinstance(data.columns, pd.MultiIndex):
-                    # Level 0 = column names (Close, Open, etc.), Level 1 = ticker
-                    data.columns = data.columns.get_level_values(0)
-
-                # Ensure standard column names exist
-                col_map = {}
-                for col in data.columns:
-                    col_lower = str(col).lower().strip()
-                    if col_lower == "close":
-                        col_map[col] = "Close"
-                    elif col_lower == "open":
-                        col_map[col] = "Open"
-                    elif col_lower == "high":
-                        col_map[col] = "High"
-                    elif col_lower == "low":
-                        col_map[col] = "Low"
-                    elif col_lower == "volume":
-                        col_map[col] = "Volume"
-                if col_map:
-                    data = data.rename(columns=col_map)
-
-                if "Close" not in data.columns:
-                    logger.warning(f"  {short:<8} ✗ No 'Close' column. Columns: {list(data.columns)}")
+                    data = data.dropna(subset=["Close"])
+                    if data.empty:
+                        logger.warning(f"  {short:<8} ✗ No data returned from yfinance")
+                        failed_tickers.append(ticker)
+                        continue
+                    data.index = pd.to_datetime(data.index)
+
+                    # Build price documents from column arrays (no iterrows): the
+                    # (rows × 4) OHLC block is rounded in one np.round call, and
+                    # missing columns default to 0
+                    ohlc = np.round(
+                        data.reindex(columns=["Open", "High", "Low", "Close"], fill_value=0.0)
+                        .to_numpy(dtype=np.float64),
+                        2,
+                    ).T.tolist()
+                    volumes = (
+                        data["Volume"].to_numpy(dtype=np.int64).tolist()
+                        if "Volume" in data.columns else [0] * len(data)
+                    )
+                    dates = data.index.strftime("%Y-%m-%d").tolist()
+                    prices = [
+                        {"date": d, "open": o, "high": h, "low": l, "close": c, "volume": v}
+                        for d, o, h, l, c, v in zip(dates, *ohlc, volumes)
+                    ]
+
+                    # Buffer across tickers; flushed to MongoDB in shared bulk writes
+                    pending[ticker] = prices
+                    pending_docs += len(prices)
+                    logger.info(f"  {short:<8} ✓ {len(prices)} records fetched")
+                    if pending_docs >= FLUSH_DOCS:
+                        total_inserted += await flush()
+
+                except Exception as e:
+                    logger.error(f"  {short:<8} ✗ Error: {e}")
                     failed_tickers.append(ticker)
                     continue
 
-                data = data.dropna(subset=["Close"])
-                data.index = pd.to_datetime(data.index)
-
-                # Convert to price documents
-                prices = []
-                for idx, row in data.iterrows():
-                    prices.append({
-                        "date": idx.strftime("%Y-%m-%d"),
-                        "open": round(float(row.get("Open", 0)), 2),
-                        "high": round(float(row.get("High", 0)), 2),
-                        "low": round(float(row.get("Low", 0)), 2),
-                        "close": round(float(row.get("Close", 0)), 2),
-                        "volume": int(row.get("Volume", 0)),
-                    })
-
-                # Save to MongoDB
-                before_count = len(prices)
-                await mongodb.save_stock_prices(ticker, prices)
-                total_inserted += before_count
-
-                logger.info(f"  {short:<8} ✓ {len(prices)} records processed")
-
-            except Exception as e:
-                logger.error(f"  {short:<8} ✗ Error: {e}")
-                failed_tickers.append(ticker)
-                continue
-
-        # Small delay between batches to be nice to yfinance
-        if i + batch_size < len(tickers):
-            await asyncio.sleep(2)
+    if pending:
+        total_inserted += await flush()
 
     # ── Summary ──
     logger.info("\n" + "=" * 70)
     logger.info("  SEEDING COMPLETE")
-    logger.info(f"  Total records processed: {total_inserted:,}")
+    logger.info(f"  Total records inserted:  {total_inserted:,}")
     logger.info(f"  Tickers up to date:      {total_skipped}")
     logger.info(f"  Failed tickers:          {len(failed_tickers)}")
     if failed_tickers:
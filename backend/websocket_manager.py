@@ -1,47 +1,79 @@
 """
 WebSocket connection manager for broadcasting real-time index updates.
 """
+import asyncio
 import logging
-import json
+import orjson
 from fastapi import WebSocket
 from typing import Any
 
 logger = logging.getLogger("mhgi.websocket")
 
+# Clients sent to per gather() in a broadcast; the loop yields between batches
+BROADCAST_BATCH_SIZE = 50
+
 
 class ConnectionManager:
     """Manages WebSocket connections and broadcasts index updates."""
 
     def __init__(self):
-        self.active_connections: list[WebSocket] = []
+        # Copy-on-write: connect/disconnect swap in a new tuple, so a broadcast
+        # iterates its captured tuple without seeing concurrent changes
+        self.active_connections: tuple[WebSocket, ...] = ()
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
-        self.active_connections.append(websocket)
+        self.active_connections = self.active_connections + (websocket,)
         logger.info(f"Client connected. Total: {len(self.active_connections)}")
 
     def disconnect(self, websocket: WebSocket):
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
+        self.active_connections = tuple(
+            c for c in self.active_connections if c is not websocket
+        )
         logger.info(f"Client disconnected. Total: {len(self.active_connections)}")
 
     async def broadcast(self, data: Any):
-        """Broadcast data to all connected clients."""
-        if not self.active_connections:
+        """Broadcast data to all connected clients (JSON-encodable, or pre-encoded JSON bytes)."""
+        conns = self.active_connections
+        if not conns:
             return
 
-        message = json.dumps(data, default=str)
+        # Encode once; every client is sent the same binary frame in a single
+        # send_bytes (uncompressed — main.py runs uvicorn without permessage-deflate)
+        message = (
+            data if isinstance(data, bytes)
+            else orjson.dumps(data, default=str, option=orjson.OPT_SERIALIZE_NUMPY)
+        )
+
+        # Large fan-outs go out in batches, yielding to the event loop between them
         disconnected = []
+        for i in range(0, len(conns), BROADCAST_BATCH_SIZE):
+            if i:
+                await asyncio.sleep(0)
+            disconnected += await self._send_batch(conns[i:i + BROADCAST_BATCH_SIZE], message)
 
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(message)
-            except Exception as e:
-                logger.warning(f"Failed to send to client: {e}")
-                disconnected.append(connection)
+        if disconnected:
+            # One rebuild for all failed clients rather than one per disconnect
+            failed = set(map(id, disconnected))
+            self.active_connections = tuple(
+                c for c in self.active_connections if id(c) not in failed
+            )
+            logger.info(
+                f"Dropped {len(disconnected)} client(s). Total: {len(self.active_connections)}"
+            )
 
-        for conn in disconnected:
-            self.disconnect(conn)
+    @staticmethod
+    async def _send_batch(conns: tuple[WebSocket, ...], message: bytes) -> list[WebSocket]:
+        """Send to a batch of clients concurrently; returns those that failed."""
+        results = await asyncio.gather(
+            *(c.send_bytes(message) for c in conns), return_exceptions=True
+        )
+        failed = []
+        for conn, result in zip(conns, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Failed to send to client: {result}")
+                failed.append(conn)
+        return failed
 
     @property
     def client_count(self) -> int:
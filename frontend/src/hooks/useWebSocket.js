@@ -3,6 +3,8 @@ import { useState, useEffect, useRef, useCallback } from 'react';
 const WS_URL = (import.meta.env.VITE_WS_URL || 'ws://localhost:8000') + '/ws/index';
 const RECONNECT_DELAY = 3000;
 const MAX_RECONNECT = 10;
+// Broadcasts arrive as binary (UTF-8 JSON) frames
+const decoder = new TextDecoder();
 
 export function useWebSocket() {
     const [indexData, setIndexData] = useState(null);
@@ -21,6 +23,7 @@ export function useWebSocket() {
 
         try {
             const ws = new WebSocket(WS_URL);
+            ws.binaryType = 'arraybuffer';
             wsRef.current = ws;
 
             ws.onopen = () => {
@@ -38,7 +41,8 @@ export function useWebSocket() {
 
             ws.onmessage = (event) => {
                 try {
-                    const data = JSON.parse(event.data);
+                    const text = typeof event.data === 'string' ? event.data : decoder.decode(event.data);
+                    const data = JSON.parse(text);
 
                     if (data.type === 'initial' || data.type === 'index_update' || data.type === 'eod_update') {
                         if (data.index) {